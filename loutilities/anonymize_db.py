@@ -16,14 +16,23 @@ Usage:
 
     # Multiple files to an output directory (same filenames):
     anonymize_db -c anonymize_members.yaml --output-dir ./anon/ users.sql members.sql
+
+    # Process the tables of each file in 4 parallel processes:
+    anonymize_db -c anonymize_members.yaml -j 4 --output-dir ./anon/ users.sql members.sql
 """
 
 import argparse
+import io
 import os
 import random
 import re
+import shutil
 import sys
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
+from itertools import islice
 
 import yaml
 
@@ -32,53 +41,98 @@ import yaml
 # SQL value tokenizer
 # ---------------------------------------------------------------------------
 
+# A quoted string literal; backslash escapes any character, including a quote.
+_STRING = r"'[^'\\]*(?:\\.[^'\\]*)*'"
+
+# One row of an INSERT VALUES clause which has no parentheses outside of string
+# literals. The lone '(' alternative matches where this fails (nested parentheses
+# or an unterminated string), so the caller can fall back to _scan_row().
+_ROW_RE = re.compile(r"\(([^'()]*(?:" + _STRING + r"[^'()]*)*)\)|\(", re.S)
+
+# One column token of a row, with surrounding blanks and the following comma. An
+# unterminated string literal runs to the end of the row, NULL must be followed by
+# a separator, a hex literal ends at the first non-hex digit, and a token is empty
+# only when directly followed by a comma.
+_TOKEN_RE = re.compile(r"""
+    [ \t]*
+    (
+        '[^'\\]*(?:\\.[^'\\]*)*(?:'|\\?\Z)
+      | NULL(?=[,\ \t]|\Z)
+      | 0[xX][0-9a-fA-F]*
+      | [^,\ \t]+
+      | (?=,)
+    )
+    [ \t]*,?
+""", re.S | re.X)
+
+
 def _split_insert_rows(values_str):
     """
     Split the VALUES clause of an INSERT statement into per-row content strings
     (without the surrounding parentheses). Handles strings containing commas
     and parentheses correctly.
     """
+    return _split_complete_rows(values_str)[0]
+
+
+def _split_complete_rows(values_str):
+    """
+    As _split_insert_rows, but also return the index of the '(' which starts a
+    row not terminated by the end of values_str, or len(values_str) if none.
+    """
     rows = []
-    i = 0
+    pos = 0
+
+    while True:
+        for m in _ROW_RE.finditer(values_str, pos):
+            row = m.group(1)
+            if row is None:
+                break
+            rows.append(row)
+        else:
+            return rows, len(values_str)
+
+        # Row needs the full scan, starting after its '('
+        row, pos = _scan_row(values_str, m.end())
+        if row is None:
+            return rows, m.start()
+        rows.append(row)
+
+
+def _scan_row(values_str, i):
+    """
+    Scan one row starting just after its opening paren, tracking nested parens
+    and string literals. Returns (row content, index after closing paren), or
+    (None, len(values_str)) if the row is not terminated.
+    """
     n = len(values_str)
+    start = i
+    depth = 1
 
     while i < n:
-        # Advance to opening paren of next row
-        while i < n and values_str[i] != '(':
+        c = values_str[i]
+        if c == "'":                        # string literal
             i += 1
-        if i >= n:
-            break
-
-        i += 1          # skip '('
-        start = i
-        depth = 1
-
-        while i < n and depth > 0:
-            c = values_str[i]
-            if c == "'":                        # string literal
-                i += 1
-                while i < n:
-                    if values_str[i] == '\\':
-                        i += 2                  # skip escape sequence
-                    elif values_str[i] == "'":
-                        i += 1
-                        break
-                    else:
-                        i += 1
-            elif c == '(':
-                depth += 1
-                i += 1
-            elif c == ')':
-                depth -= 1
-                if depth == 0:
-                    rows.append(values_str[start:i])
-                    i += 1                      # skip ')'
+            while i < n:
+                if values_str[i] == '\\':
+                    i += 2                  # skip escape sequence
+                elif values_str[i] == "'":
+                    i += 1
+                    break
                 else:
                     i += 1
-            else:
-                i += 1
+        elif c == '(':
+            depth += 1
+            i += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return values_str[start:i], i + 1
+            i += 1
+        else:
+            i += 1
 
-    return rows
+    return None, n
 
 
 def _tokenize_row(s):
@@ -87,53 +141,21 @@ def _tokenize_row(s):
     of raw SQL tokens, one per column. Tokens preserve original quoting so
     un-modified columns are written back verbatim.
     """
-    tokens = []
-    i = 0
-    n = len(s)
-
-    while i < n:
-        while i < n and s[i] in ' \t':
-            i += 1
-        if i >= n:
-            break
+    return _TOKEN_RE.findall(s)
 
-        start = i
 
-        if s[i] == "'":
-            # String literal — scan to closing unescaped quote
-            i += 1
-            while i < n:
-                if s[i] == '\\':
-                    i += 2
-                elif s[i] == "'":
-                    i += 1
-                    break
-                else:
-                    i += 1
-            token = s[start:i]
-        elif s[i:i+4] == 'NULL' and (i + 4 >= n or s[i + 4] in (',', ' ', '\t')):
-            token = 'NULL'
-            i += 4
-        elif s[i] == '0' and i + 1 < n and s[i + 1] in 'xX':
-            # Hex literal
-            i += 2
-            while i < n and s[i] in '0123456789abcdefABCDEF':
-                i += 1
-            token = s[start:i]
-        else:
-            # Unquoted number or other literal
-            while i < n and s[i] not in (',', ' ', '\t'):
-                i += 1
-            token = s[start:i]
+_ESCAPE_MAP = {
+    'n': '\n', 'r': '\r', 't': '\t', '0': '\0',
+    "'": "'", '\\': '\\', '"': '"', 'b': '\b', 'Z': '\x1a',
+}
 
-        tokens.append(token)
+# A backslash escape; a backslash at the very end is left as is
+_ESCAPE_RE = re.compile(r'\\(.)', re.S)
 
-        while i < n and s[i] in ' \t':
-            i += 1
-        if i < n and s[i] == ',':
-            i += 1
 
-    return tokens
+def _unescape(m):
+    c = m.group(1)
+    return _ESCAPE_MAP.get(c, c)
 
 
 def _sql_to_python(token):
@@ -142,20 +164,9 @@ def _sql_to_python(token):
         return None
     if token.startswith("'") and token.endswith("'"):
         s = token[1:-1]
-        result = []
-        i = 0
-        escape_map = {
-            'n': '\n', 'r': '\r', 't': '\t', '0': '\0',
-            "'": "'", '\\': '\\', '"': '"', 'b': '\b', 'Z': '\x1a',
-        }
-        while i < len(s):
-            if s[i] == '\\' and i + 1 < len(s):
-                result.append(escape_map.get(s[i + 1], s[i + 1]))
-                i += 2
-            else:
-                result.append(s[i])
-                i += 1
-        return ''.join(result)
+        if '\\' not in s:
+            return s
+        return _ESCAPE_RE.sub(_unescape, s)
     return token     # number or hex literal — return as-is
 
 
@@ -226,13 +237,40 @@ _GENERATORS = {
 _CREATE_TABLE_RE = re.compile(r'^CREATE TABLE `(\w+)`')
 _COLUMN_DEF_RE   = re.compile(r'^\s+`(\w+)`\s')
 
+# Compiled handling of one table's rows for one column list:
+#   pk_idx      - index of the primary key column, or None
+#   sync_fields - [(field_name, index, generate), ...] to store for sync targets
+#   fields      - [(index, generate), ...] to anonymize, in config order
+#   ntokens     - number of leading tokens the above need
+_TablePlan = namedtuple('_TablePlan', 'pk_idx sync_fields fields ntokens')
+
+# Byte range of a dump file for parallel processing, with the INSERT tables in
+# it and the table columns known where it starts
+_Segment = namedtuple('_Segment', 'start end tables table_columns')
+
+# Segment size at which parallel processing splits a table's INSERTs
+_SEGMENT_SIZE = 16 * 1024 * 1024
+
+# Characters of a multi-line INSERT collected before splitting out its rows
+_STREAM_BATCH_SIZE = 256 * 1024
+
 
 class DumpAnonymizer:
-    """Stream-processes mysqldump files, replacing configured PII columns."""
+    """
+    Stream-processes mysqldump files, replacing configured PII columns.
 
-    def __init__(self, config):
+    With lazy=True, each row is only tokenized as far as the last column that
+    anonymization reads, and changed values are spliced into the original row
+    text. Rows are then not checked for a column count mismatch beyond that
+    column, and unchanged text (including any spacing) is copied verbatim.
+    """
+
+    def __init__(self, config, lazy=False):
+        self._config = config
+        self._lazy = lazy
         self._tables_cfg = config.get('tables', {})
         self._table_columns = {}        # table_name -> [col, ...]
+        self._plans = {}                # (table_name, (col, ...)) -> _TablePlan
         # sync_maps[source_table][source_pk_value] = {field_name: anon_value}
         self._sync_maps = {}
 
@@ -273,104 +311,137 @@ class DumpAnonymizer:
     # Value generation
     # ------------------------------------------------------------------
 
-    def _generate(self, field_cfg, row_id, original_val, columns, tokens):
+    def _compile_field(self, field_cfg, columns):
         """
-        Compute the anonymized Python value for one field.
-        Returns the original value unchanged if the type is unknown.
+        Return generate(row_id, original_val, tokens), which computes the
+        anonymized Python value for one field. The generated function returns
+        the original value unchanged if the type is unknown.
         """
         ftype = field_cfg.get('type', 'text')
 
-        # NULL preservation: keep NULL for every type except 'fixed'
-        if original_val is None and ftype not in ('fixed', 'sync'):
-            return None
-
         if ftype == 'sync':
             src_table  = field_cfg['source_table']
             src_field  = field_cfg.get('source_field')   # caller sets this
             join_field = field_cfg['join_field']
+            join_idx   = columns.index(join_field) if join_field in columns else None
+            sync_maps  = self._sync_maps
 
-            join_val = None
-            if join_field in columns:
-                join_val = _sql_to_python(tokens[columns.index(join_field)])
+            def generate(row_id, original_val, tokens):
+                join_val = None
+                if join_idx is not None:
+                    join_val = _sql_to_python(tokens[join_idx])
 
-            return (self._sync_maps
-                    .get(src_table, {})
-                    .get(join_val, {})
-                    .get(src_field, original_val))
+                return (sync_maps
+                        .get(src_table, {})
+                        .get(join_val, {})
+                        .get(src_field, original_val))
+            return generate
 
         if ftype == 'fixed':
-            return field_cfg.get('value', 'anonymized')
+            value = field_cfg.get('value', 'anonymized')
+            return lambda row_id, original_val, tokens: value
 
         generator = _GENERATORS.get(ftype)
         if generator is None:
-            return original_val
+            return lambda row_id, original_val, tokens: original_val
 
-        try:
-            rid = int(row_id) if row_id is not None else 0
-        except (ValueError, TypeError):
-            rid = abs(hash(str(row_id))) % 1_000_000
+        def generate(row_id, original_val, tokens):
+            # NULL preservation: keep NULL for every type except 'fixed' and 'sync'
+            if original_val is None:
+                return None
 
-        return generator(rid, original_val)
+            try:
+                rid = int(row_id) if row_id is not None else 0
+            except (ValueError, TypeError):
+                rid = abs(hash(str(row_id))) % 1_000_000
+
+            return generator(rid, original_val)
+        return generate
 
     # ------------------------------------------------------------------
-    # Sync map population
+    # Per-table column plans
     # ------------------------------------------------------------------
 
-    def _populate_sync_map(self, table_name, columns, row_id, tokens):
+    def _plan(self, table_name, columns):
         """
-        If table_name is a sync source, compute and store the anonymized
-        values for fields that downstream tables will need.
+        Return the _TablePlan for rows of table_name with these columns, or
+        None if the table has no fields to anonymize. Plans are compiled on
+        first use for each table and column list, then reused for every row.
         """
-        needed_fields = self._sync_sources.get(table_name)
-        if not needed_fields:
-            return
+        key = (table_name, tuple(columns))
+        try:
+            return self._plans[key]
+        except KeyError:
+            pass
 
         table_cfg  = self._tables_cfg.get(table_name, {})
         fields_cfg = table_cfg.get('fields', {})
+        if not fields_cfg:
+            self._plans[key] = None
+            return None
+
+        # Row primary key for deterministic value generation
+        pk_field = table_cfg.get('pk', 'id')
+        pk_idx   = columns.index(pk_field) if pk_field in columns else None
 
-        for src_field in needed_fields:
+        # Fields whose anonymized values downstream sync tables will need
+        sync_fields = []
+        for src_field in self._sync_sources.get(table_name, ()):
             fcfg = fields_cfg.get(src_field)
             if not fcfg or src_field not in columns:
                 continue
-            original_val = _sql_to_python(tokens[columns.index(src_field)])
-            anon_val = self._generate(fcfg, row_id, original_val, columns, tokens)
+            sync_fields.append((src_field, columns.index(src_field),
+                                self._compile_field(fcfg, columns)))
 
-            (self._sync_maps
-             .setdefault(table_name, {})
-             .setdefault(row_id, {})[src_field]) = anon_val
+        fields = []
+        for field_name, fcfg in fields_cfg.items():
+            if field_name not in columns:
+                continue
+
+            # For sync fields, inject source_field so the generator can look it up
+            if fcfg.get('type') == 'sync' and 'source_field' not in fcfg:
+                fcfg = dict(fcfg, source_field=field_name)
+
+            fields.append((columns.index(field_name), self._compile_field(fcfg, columns)))
+
+        # Tokens a row needs for _anonymize_row, for lazy tokenization
+        needed = [idx for idx, _generate in fields]
+        if pk_idx is not None:
+            needed.append(pk_idx)
+        for _field, fcfg in fields_cfg.items():
+            if _field in columns and fcfg.get('type') == 'sync' and fcfg['join_field'] in columns:
+                needed.append(columns.index(fcfg['join_field']))
+        ntokens = max(needed, default=-1) + 1
+
+        plan = _TablePlan(pk_idx, sync_fields, fields, ntokens)
+        self._plans[key] = plan
+        return plan
 
     # ------------------------------------------------------------------
     # Row anonymization
     # ------------------------------------------------------------------
 
-    def _anonymize_row(self, table_name, columns, tokens):
-        """Return a new token list with PII columns replaced."""
-        table_cfg  = self._tables_cfg.get(table_name, {})
-        fields_cfg = table_cfg.get('fields', {})
-        if not fields_cfg:
+    def _anonymize_row(self, table_name, plan, tokens):
+        """Return a new token list with PII columns replaced, following plan."""
+        if plan is None:
             return tokens
 
-        # Row primary key for deterministic value generation
-        pk_field = table_cfg.get('pk', 'id')
-        row_id   = None
-        if pk_field in columns:
-            row_id = _sql_to_python(tokens[columns.index(pk_field)])
+        row_id = None
+        if plan.pk_idx is not None:
+            row_id = _sql_to_python(tokens[plan.pk_idx])
 
         # Store sync values before modifying tokens
-        self._populate_sync_map(table_name, columns, row_id, tokens)
+        for src_field, idx, generate in plan.sync_fields:
+            anon_val = generate(row_id, _sql_to_python(tokens[idx]), tokens)
+
+            (self._sync_maps
+             .setdefault(table_name, {})
+             .setdefault(row_id, {})[src_field]) = anon_val
 
         result = list(tokens)
-        for field_name, fcfg in fields_cfg.items():
-            if field_name not in columns:
-                continue
-            idx          = columns.index(field_name)
+        for idx, generate in plan.fields:
             original_val = _sql_to_python(tokens[idx])
-
-            # For sync fields, inject source_field so _generate can look it up
-            if fcfg.get('type') == 'sync' and 'source_field' not in fcfg:
-                fcfg = dict(fcfg, source_field=field_name)
-
-            anon_val = self._generate(fcfg, row_id, original_val, columns, tokens)
+            anon_val     = generate(row_id, original_val, tokens)
 
             if anon_val is None:
                 result[idx] = 'NULL'
@@ -379,21 +450,55 @@ class DumpAnonymizer:
 
         return result
 
+    def _rewrite_row(self, table_name, plan, row_str):
+        """
+        Return a row's value string with PII columns replaced, locating only the
+        tokens the plan needs and copying the rest of the text verbatim.
+        """
+        if plan is None:
+            return row_str
+
+        ntokens = plan.ntokens
+        matches = list(islice(_TOKEN_RE.finditer(row_str), ntokens))
+        if len(matches) < ntokens:
+            # Too few columns — emit unchanged to avoid corruption
+            return row_str
+
+        tokens     = [m.group(1) for m in matches]
+        new_tokens = self._anonymize_row(table_name, plan, tokens)
+
+        pieces = []
+        pos    = 0
+        for m, token, new_token in zip(matches, tokens, new_tokens):
+            if new_token != token:
+                start, end = m.span(1)
+                pieces.append(row_str[pos:start])
+                pieces.append(new_token)
+                pos = end
+        if not pieces:
+            return row_str
+        pieces.append(row_str[pos:])
+        return ''.join(pieces)
+
     # ------------------------------------------------------------------
     # INSERT line processing
     # ------------------------------------------------------------------
 
-    def _process_insert(self, line):
-        """Parse, anonymize, and re-serialise an INSERT line."""
+    def _parse_insert_header(self, line):
+        """
+        Parse the start of an INSERT statement for a configured table, up to
+        and including VALUES. Returns (table_name, col_list_str, columns,
+        text after VALUES), or None if the statement is to be left unchanged.
+        """
         if not line.startswith('INSERT INTO `'):
-            return line
+            return None
 
         i          = 13                     # len('INSERT INTO `')
         j          = line.index('`', i)
         table_name = line[i:j]
 
         if table_name not in self._tables_cfg:
-            return line
+            return None
 
         rest = line[j + 1:].lstrip()       # text after closing backtick
 
@@ -408,29 +513,42 @@ class DumpAnonymizer:
             columns = self._table_columns.get(table_name, [])
 
         if not columns:
-            return line
+            return None
 
         if not rest.upper().startswith('VALUES'):
+            return None
+
+        return table_name, col_list_str, columns, rest[6:]
+
+    def _anonymize_row_str(self, table_name, plan, columns, row_str):
+        """Return the anonymized text of one row, including its parentheses."""
+        if self._lazy:
+            return '(' + self._rewrite_row(table_name, plan, row_str) + ')'
+
+        tokens = _tokenize_row(row_str)
+        if len(tokens) != len(columns):
+            # Column count mismatch — emit unchanged to avoid corruption
+            return f'({row_str})'
+        return '(' + ','.join(self._anonymize_row(table_name, plan, tokens)) + ')'
+
+    def _process_insert(self, line):
+        """Parse, anonymize, and re-serialise an INSERT line."""
+        header = self._parse_insert_header(line)
+        if header is None:
             return line
+        table_name, col_list_str, columns, values_tail = header
 
         # Preserve output line format: detect newline between VALUES and first row
-        values_tail = rest[6:]              # text after 'VALUES'
         multiline   = '\n' in values_tail.lstrip(' \t')
         rest        = values_tail.lstrip()  # strip whitespace including newline
         rest        = rest.rstrip()
         if rest.endswith(';'):
             rest = rest[:-1]
 
-        row_strings = _split_insert_rows(rest)
-        new_rows = []
-        for row_str in row_strings:
-            tokens = _tokenize_row(row_str)
-            if len(tokens) != len(columns):
-                # Column count mismatch — emit unchanged to avoid corruption
-                new_rows.append(f'({row_str})')
-            else:
-                new_tokens = self._anonymize_row(table_name, columns, tokens)
-                new_rows.append('(' + ','.join(new_tokens) + ')')
+        plan = self._plan(table_name, columns)
+
+        new_rows = [self._anonymize_row_str(table_name, plan, columns, row_str)
+                    for row_str in _split_insert_rows(rest)]
 
         if multiline:
             rows_str = ',\n'.join(new_rows)
@@ -442,18 +560,50 @@ class DumpAnonymizer:
                 return f'INSERT INTO `{table_name}` ({col_list_str}) VALUES {",".join(new_rows)};\n'
             return f'INSERT INTO `{table_name}` VALUES {",".join(new_rows)};\n'
 
+    def _start_insert_stream(self, line, outfile):
+        """
+        Start anonymizing a multi-line INSERT row by row, given its first line.
+        Returns an _InsertStream, or None if the first line does not hold the
+        whole header (through VALUES) or the statement is to be left unchanged,
+        in which case the caller buffers the statement.
+        """
+        try:
+            header = self._parse_insert_header(line)
+        except ValueError:
+            # Column list continues on a later line
+            return None
+        if header is None:
+            return None
+        table_name, col_list_str, columns, values_tail = header
+        return _InsertStream(self, outfile, table_name, col_list_str, columns, values_tail)
+
     # ------------------------------------------------------------------
     # File processing
     # ------------------------------------------------------------------
 
     def process_file(self, infile, outfile):
-        """Stream one mysqldump file from infile to outfile."""
+        """
+        Stream one mysqldump file from infile to outfile.
+
+        A multi-line INSERT is anonymized row by row as its lines are read, so
+        memory is bounded by a batch plus the largest row rather than the
+        statement.
+        """
         in_create       = False
         create_buffer   = []
+        insert_stream   = None  # multi-line INSERT being anonymized row by row
         insert_buffer   = []    # multi-line INSERT that needs anonymizing
         insert_passthru = False # multi-line INSERT whose table is not in config
 
         for line in infile:
+            # Multi-line INSERT — anonymize rows as they complete
+            if insert_stream is not None:
+                insert_stream.feed(line)
+                if line.rstrip('\n').rstrip().endswith(';'):
+                    insert_stream.close()
+                    insert_stream = None
+                continue
+
             # Multi-line INSERT — pass-through (table not in config)
             if insert_passthru:
                 outfile.write(line)
@@ -498,7 +648,9 @@ class DumpAnonymizer:
                     i = 13      # len('INSERT INTO `')
                     j = line.index('`', i)
                     if line[i:j] in self._tables_cfg:
-                        insert_buffer = [line]
+                        insert_stream = self._start_insert_stream(line, outfile)
+                        if insert_stream is None:
+                            insert_buffer = [line]
                     else:
                         insert_passthru = True
                         outfile.write(line)
@@ -506,13 +658,27 @@ class DumpAnonymizer:
 
             outfile.write(line)
 
-    def process_files(self, file_pairs):
+        # Statement cut off by the end of the file
+        if insert_stream is not None:
+            insert_stream.truncate()
+
+    def process_files(self, file_pairs, jobs=1):
         """
         Process (input_path, output_path_or_None) pairs in order.
-        Pass None as output_path to write to stdout.
+        Pass None as output_path to write to stdout. With jobs > 1, the
+        segments of each file are processed by a pool of that many processes.
         """
         for inpath, outpath in file_pairs:
             print(f'Processing {inpath} ...', file=sys.stderr)
+            if jobs > 1:
+                if outpath:
+                    with open(outpath, 'w', encoding='utf-8') as outf:
+                        self.process_file_parallel(inpath, outf, jobs)
+                    print(f'  -> {outpath}', file=sys.stderr)
+                else:
+                    self.process_file_parallel(inpath, sys.stdout, jobs)
+                continue
+
             with open(inpath, 'r', encoding='utf-8', errors='replace') as inf:
                 if outpath:
                     with open(outpath, 'w', encoding='utf-8') as outf:
@@ -521,6 +687,283 @@ class DumpAnonymizer:
                 else:
                     self.process_file(inf, sys.stdout)
 
+    # ------------------------------------------------------------------
+    # Parallel file processing
+    # ------------------------------------------------------------------
+
+    def _split_segments(self, inpath, segment_size):
+        """
+        Split a dump file into _Segments which can be processed independently,
+        given the table columns and sync maps in effect where they start.
+
+        Segments start at a CREATE TABLE, or at an INSERT once the current
+        segment has segment_size bytes, and never inside a CREATE TABLE block
+        or multi-line INSERT. Lines are tracked with the same state machine as
+        process_file, which also updates self._table_columns as it would.
+        """
+        segments   = []
+        seg_start  = 0
+        seg_tables = set()
+        seg_cols   = dict(self._table_columns)
+        offset     = 0
+        in_create  = False
+        in_insert  = False
+        create_buffer = []
+
+        with open(inpath, 'rb') as f:
+            for raw in f:
+                text = raw.decode('utf-8', 'replace')
+                # Match the text-mode reading of process_files (universal newlines)
+                if '\r' in text:
+                    parts = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+                    lines = [part + '\n' for part in parts[:-1]]
+                    if parts[-1]:
+                        lines.append(parts[-1])
+                else:
+                    lines = [text]
+
+                for n, line in enumerate(lines):
+                    if in_insert:
+                        if line.rstrip('\n').rstrip().endswith(';'):
+                            in_insert = False
+                        continue
+
+                    if in_create:
+                        create_buffer.append(line.rstrip('\n'))
+                        if line.startswith(')'):
+                            tname, cols = self._parse_create_table('\n'.join(create_buffer))
+                            if tname and cols:
+                                self._table_columns[tname] = cols
+                            in_create     = False
+                            create_buffer = []
+                        continue
+
+                    is_create = bool(_CREATE_TABLE_RE.match(line))
+                    is_insert = line.startswith('INSERT INTO `')
+
+                    # Start a new segment here?
+                    if (n == 0 and offset > seg_start and
+                            (is_create or (is_insert and offset - seg_start >= segment_size))):
+                        segments.append(_Segment(seg_start, offset, seg_tables, seg_cols))
+                        seg_start  = offset
+                        seg_tables = set()
+                        seg_cols   = dict(self._table_columns)
+
+                    if is_create:
+                        in_create     = True
+                        create_buffer = [line.rstrip('\n')]
+                    elif is_insert:
+                        seg_tables.add(line[13:line.index('`', 13)])
+                        if not line.rstrip('\n').rstrip().endswith(';'):
+                            in_insert = True
+
+                offset += len(raw)
+
+        if offset > seg_start:
+            segments.append(_Segment(seg_start, offset, seg_tables, seg_cols))
+        return segments
+
+    def _merge_sync_maps(self, sync_maps):
+        """Merge sync map entries returned by a segment into self._sync_maps."""
+        for table_name, rows in sync_maps.items():
+            table_map = self._sync_maps.setdefault(table_name, {})
+            for row_id, fields in rows.items():
+                table_map.setdefault(row_id, {}).update(fields)
+
+    def process_file_parallel(self, inpath, outfile, jobs, segment_size=None):
+        """
+        Process one mysqldump file from inpath to outfile using a pool of jobs
+        processes. Output is the same as process_file gives.
+
+        Segments which read no sync map are processed straight away. A segment
+        whose tables sync from a source table waits until every earlier segment
+        which writes that source is done, then is given the merged sync map.
+        Segment outputs are written to temporary files and copied to outfile in
+        the original order.
+        """
+        if segment_size is None:
+            segment_size = _SEGMENT_SIZE
+
+        segments = self._split_segments(inpath, segment_size)
+
+        # Tables each segment reads from and writes to the sync maps
+        reads  = []
+        writes = []
+        for segment in segments:
+            seg_reads = set()
+            for table_name in segment.tables:
+                fields_cfg = self._tables_cfg.get(table_name, {}).get('fields', {})
+                for fcfg in fields_cfg.values():
+                    if fcfg.get('type') == 'sync':
+                        seg_reads.add(fcfg['source_table'])
+            reads.append(seg_reads)
+            writes.append(segment.tables & set(self._sync_sources))
+
+        tmpdir = tempfile.mkdtemp(prefix='anonymize_db-')
+        try:
+            with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                     initargs=(self._config, self._lazy)) as pool:
+                futures = [None] * len(segments)
+
+                def submit(ndx, sync_maps):
+                    segment = segments[ndx]
+                    futures[ndx] = pool.submit(_anonymize_segment, inpath, segment.start, segment.end,
+                                               segment.table_columns, sync_maps, writes[ndx], tmpdir)
+
+                # Segments which read no sync maps can all start now
+                for ndx in range(len(segments)):
+                    if not reads[ndx]:
+                        submit(ndx, {})
+
+                # Merge writers' sync maps in segment order, as they are needed
+                writers = [ndx for ndx in range(len(segments)) if writes[ndx]]
+                merged  = 0
+
+                def merge_before(ndx):
+                    nonlocal merged
+                    while merged < len(writers) and writers[merged] < ndx:
+                        self._merge_sync_maps(futures[writers[merged]].result()[1])
+                        merged += 1
+
+                # The pool pickles arguments later, so later merges must not
+                # change the sync maps given to a segment
+                for ndx in range(len(segments)):
+                    if reads[ndx]:
+                        merge_before(ndx)
+                        submit(ndx, {src: {row_id: dict(fields)
+                                           for row_id, fields in self._sync_maps[src].items()}
+                                     for src in reads[ndx] if src in self._sync_maps})
+                merge_before(len(segments))
+
+                for future in futures:
+                    seg_outpath = future.result()[0]
+                    with open(seg_outpath, 'r', encoding='utf-8', newline='') as seg_out:
+                        shutil.copyfileobj(seg_out, outfile)
+                    os.remove(seg_outpath)
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+class _InsertStream:
+    """
+    Anonymize a multi-line INSERT statement row by row as its text arrives.
+    Text is collected into batches of about _STREAM_BATCH_SIZE characters, so
+    memory is bounded by that plus the largest row. The output is the same as
+    _process_insert gives for the whole statement. A statement cut off by the
+    end of the file keeps its complete rows, and is left unterminated.
+    """
+
+    def __init__(self, anonymizer, outfile, table_name, col_list_str, columns, values_tail):
+        self._anonymizer = anonymizer
+        self._outfile    = outfile
+        self._table_name = table_name
+        self._columns    = columns
+        self._plan       = anonymizer._plan(table_name, columns)
+        self._chunks     = []       # text not yet split into rows
+        self._size       = 0
+        self._flush_size = _STREAM_BATCH_SIZE
+        self._nrows      = 0
+
+        # Statement spans lines, so rows are always written one per line
+        if col_list_str:
+            outfile.write(f'INSERT INTO `{table_name}` ({col_list_str}) VALUES\n')
+        else:
+            outfile.write(f'INSERT INTO `{table_name}` VALUES\n')
+        self.feed(values_tail)
+
+    def feed(self, text):
+        """Add text of the statement, writing completed rows once a batch is collected."""
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._size >= self._flush_size:
+            self._flush()
+
+    def _flush(self):
+        """Anonymize and write the completed rows, keeping any unterminated row."""
+        text = ''.join(self._chunks)
+        rows, end = _split_complete_rows(text)
+        if rows:
+            anonymize = self._anonymizer._anonymize_row_str
+            new_rows  = [anonymize(self._table_name, self._plan, self._columns, row_str)
+                         for row_str in rows]
+            if self._nrows:
+                self._outfile.write(',\n')
+            self._outfile.write(',\n'.join(new_rows))
+            self._nrows += len(rows)
+
+        rest         = text[end:]
+        self._chunks = [rest] if rest else []
+        self._size   = len(rest)
+
+        # An unterminated row is rescanned from its start, so wait for at
+        # least as much new text as is kept, making the rescans linear overall
+        self._flush_size = self._size + max(_STREAM_BATCH_SIZE, self._size)
+
+    def close(self):
+        """Write the remaining rows and terminate the statement."""
+        self._flush()
+        self._outfile.write(';\n')
+
+    def truncate(self):
+        """Write the remaining complete rows of a statement cut off by the end of the file."""
+        self._flush()
+        if self._nrows:
+            self._outfile.write('\n')
+
+
+# ---------------------------------------------------------------------------
+# Parallel worker
+# ---------------------------------------------------------------------------
+
+class _ByteRange(io.RawIOBase):
+    """Readable view of bytes start to end of an open binary file."""
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self._f         = f
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self._remaining)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        b[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+_worker_config = None
+_worker_lazy   = False
+
+
+def _init_worker(config, lazy):
+    global _worker_config, _worker_lazy
+    _worker_config = config
+    _worker_lazy   = lazy
+
+
+def _anonymize_segment(inpath, start, end, table_columns, sync_maps, writes, tmpdir):
+    """
+    Anonymize one segment of a dump file into a temporary file in tmpdir.
+    Returns (temporary file path, {table: sync map} for the tables in writes).
+    """
+    anonymizer = DumpAnonymizer(_worker_config, lazy=_worker_lazy)
+    anonymizer._table_columns = table_columns
+    anonymizer._sync_maps     = sync_maps
+
+    fd, outpath = tempfile.mkstemp(suffix='.sql', dir=tmpdir)
+    with open(inpath, 'rb') as raw, open(fd, 'w', encoding='utf-8', newline='') as outf:
+        inf = io.TextIOWrapper(io.BufferedReader(_ByteRange(raw, start, end)),
+                               encoding='utf-8', errors='replace')
+        anonymizer.process_file(inf, outf)
+
+    return outpath, {table_name: anonymizer._sync_maps[table_name]
+                     for table_name in writes if table_name in anonymizer._sync_maps}
+
 
 # ---------------------------------------------------------------------------
 # CLI entry point
@@ -544,6 +987,17 @@ def main():
         help='Write output files here, using the same filenames as the inputs. '
              'Required when more than one input file is given.',
     )
+    parser.add_argument(
+        '--lazy', action='store_true',
+        help='Only tokenize each row as far as the last column needed, copying the '
+             'rest of the row verbatim. Faster for wide tables, but rows are not '
+             'checked for a column count mismatch.',
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        help='Process independent tables of each file in N parallel processes '
+             '(default 1).',
+    )
     parser.add_argument(
         'inputs', nargs='+', metavar='DUMP_FILE',
         help='Input mysqldump SQL file(s)',
@@ -553,7 +1007,7 @@ def main():
     with open(args.config) as f:
         config = yaml.safe_load(f)
 
-    anonymizer = DumpAnonymizer(config)
+    anonymizer = DumpAnonymizer(config, lazy=args.lazy)
 
     if args.output_dir:
         os.makedirs(args.output_dir, exist_ok=True)
@@ -566,7 +1020,7 @@ def main():
             parser.error('Multiple input files require --output-dir.')
         file_pairs = [(args.inputs[0], None)]
 
-    anonymizer.process_files(file_pairs)
+    anonymizer.process_files(file_pairs, jobs=args.jobs)
 
 
 if __name__ == '__main__':
@@ -5,6 +5,7 @@
 #   Date        Author      Reason
 #   ----        ------      ------
 #   05/09/13    Lou King    Create
+#   10/18/26    Lou King    Implement expression language for row filters
 #
 #   Copyright 2013 Lou King
 #
@@ -25,10 +26,38 @@
 boolexpr - parse boolean expressions
 ===============================================================
 
-    
+A :class:`BoolExpr` is parsed once into an abstract syntax tree, then compiled into a
+function which evaluates a row. Rows may be dicts (or other mappings), or lists with
+the column headers given to :meth:`BoolExpr.compile`.
+
+Expression syntax::
+
+    expr        := term ('or' term)*
+    term        := factor ('and' factor)*
+    factor      := 'not' factor | '(' expr ')' | test
+    test        := operand ('='|'=='|'!='|'<'|'<='|'>'|'>=') operand
+                 | column ['not'] 'in' '(' literal, ... ')'
+                 | column ['not'] 'between' literal 'and' literal
+                 | column ['not'] 'matches' string
+                 | column 'is' ['not'] 'null'
+    operand     := column | literal
+    column      := name | `any column header`
+    literal     := 'string' | "string" | number
+
+Keywords are case insensitive. When a column is compared with a number, the column value
+is converted to a number; a value which can't be converted doesn't satisfy the test. Otherwise
+values are compared as strings. 'matches' uses :func:`re.search`. A column 'is null' if it
+is missing, None or an empty string.
+
+For example::
+
+    gender = 'F' and age between 40 and 49 and not (city in ('Frederick', 'Walkersville'))
+    `dist(km)` >= 5 or name matches '^Mc'
 '''
 
 # standard
+import re
+import operator
 
 # pypi
 
@@ -39,11 +68,452 @@ boolexpr - parse boolean expressions
 # home grown
 
 class invalidParameter(Exception): pass
+class parseError(Exception): pass
+
+KEYWORDS = ['and', 'or', 'not', 'in', 'between', 'matches', 'is', 'null']
+
+COMPARISONS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# tokens, in order of precedence
+TOKENRE = re.compile(r'''
+    \s*(?:
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?![\w.])
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<column>`[^`]*`)
+      | (?P<name>[A-Za-z_][\w.]*)
+      | (?P<op>==|!=|<=|>=|=|<|>)
+      | (?P<punct>[(),])
+    )''', re.VERBOSE)
+
+ESCAPERE = re.compile(r'\\(.)')
+
+#----------------------------------------------------------------------
+def tokenize(expr):
+#----------------------------------------------------------------------
+    '''
+    split expression into tokens
+
+    :param expr: expression string
+    :rtype: list of (kind, value), kind is 'number', 'string', 'column', 'keyword', 'op', 'punct'
+    '''
+    tokens = []
+    pos = 0
+    end = len(expr.rstrip())
+    while pos < end:
+        match = TOKENRE.match(expr, pos)
+        if not match:
+            raise parseError('invalid expression at position {}: {}'.format(pos, expr[pos:]))
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'number':
+            value = float(value) if re.search(r'[.eE]', value) else int(value)
+        elif kind == 'string':
+            value = ESCAPERE.sub(r'\1', value[1:-1])
+        elif kind == 'column':
+            value = value[1:-1]
+        elif kind == 'name':
+            if value.lower() in KEYWORDS:
+                kind = 'keyword'
+                value = value.lower()
+            else:
+                kind = 'column'
+        tokens.append((kind, value))
+    return tokens
+
+################################################################################
+class _Parser():
+################################################################################
+    '''
+    recursive descent parser, creates abstract syntax tree of tuples
+
+        ('or', node, node, ...)
+        ('and', node, node, ...)
+        ('not', node)
+        ('cmp', op, operand, operand), operand is ('column', name) or ('literal', value)
+        ('in', column, [value, ...])
+        ('between', column, low, high)
+        ('matches', column, pattern)
+        ('null', column)
+
+    :param expr: expression string
+    '''
+    def __init__(self, expr):
+        self.expr = expr
+        self.tokens = tokenize(expr)
+        self.pos = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise parseError('empty expression')
+        node = self.orexpr()
+        if self.pos != len(self.tokens):
+            self.error('unexpected {}'.format(self.tokens[self.pos][1]))
+        return node
+
+    def error(self, msg):
+        raise parseError('{}: {}'.format(self.expr, msg))
+
+    def peek(self, kind=None, value=None):
+        if self.pos >= len(self.tokens):
+            return False
+        thiskind, thisvalue = self.tokens[self.pos]
+        return (kind is None or thiskind == kind) and (value is None or thisvalue == value)
+
+    def next(self):
+        if self.pos >= len(self.tokens):
+            self.error('unexpected end of expression')
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expect(self, kind, value=None):
+        if not self.peek(kind, value):
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else 'end of expression'
+            self.error('expected {}, found {}'.format(value or kind, found))
+        return self.next()[1]
+
+    def orexpr(self):
+        nodes = [self.andexpr()]
+        while self.peek('keyword', 'or'):
+            self.next()
+            nodes.append(self.andexpr())
+        return nodes[0] if len(nodes) == 1 else ('or',) + tuple(nodes)
+
+    def andexpr(self):
+        nodes = [self.notexpr()]
+        while self.peek('keyword', 'and'):
+            self.next()
+            nodes.append(self.notexpr())
+        return nodes[0] if len(nodes) == 1 else ('and',) + tuple(nodes)
+
+    def notexpr(self):
+        if self.peek('keyword', 'not'):
+            self.next()
+            return ('not', self.notexpr())
+        if self.peek('punct', '('):
+            self.next()
+            node = self.orexpr()
+            self.expect('punct', ')')
+            return node
+        return self.test()
+
+    def literal(self):
+        if self.peek('number') or self.peek('string'):
+            return self.next()[1]
+        self.error('expected literal, found {}'.format(self.tokens[self.pos][1] if self.pos < len(self.tokens) else 'end of expression'))
+
+    def operand(self):
+        if self.peek('column'):
+            return ('column', self.next()[1])
+        return ('literal', self.literal())
+
+    def test(self):
+        left = self.operand()
+
+        if self.peek('op'):
+            op = self.next()[1]
+            right = self.operand()
+            return ('cmp', op, left, right)
+
+        # remaining tests require column on the left
+        if left[0] != 'column':
+            self.error('expected comparison after {!r}'.format(left[1]))
+        column = left[1]
+
+        if self.peek('keyword', 'is'):
+            self.next()
+            negate = self.peek('keyword', 'not')
+            if negate: self.next()
+            self.expect('keyword', 'null')
+            node = ('null', column)
+            return ('not', node) if negate else node
+
+        negate = self.peek('keyword', 'not')
+        if negate: self.next()
+
+        if self.peek('keyword', 'in'):
+            self.next()
+            self.expect('punct', '(')
+            values = [self.literal()]
+            while self.peek('punct', ','):
+                self.next()
+                values.append(self.literal())
+            self.expect('punct', ')')
+            node = ('in', column, values)
+
+        elif self.peek('keyword', 'between'):
+            self.next()
+            low = self.literal()
+            self.expect('keyword', 'and')
+            high = self.literal()
+            node = ('between', column, low, high)
+
+        elif self.peek('keyword', 'matches'):
+            self.next()
+            pattern = self.expect('string')
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                self.error('invalid regular expression {!r}: {}'.format(pattern, e))
+            node = ('matches', column, pattern)
+
+        else:
+            self.error('expected comparison after {}'.format(column))
+
+        return ('not', node) if negate else node
+
+#----------------------------------------------------------------------
+def _isnumber(value):
+#----------------------------------------------------------------------
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+#----------------------------------------------------------------------
+def _tonumber(value):
+#----------------------------------------------------------------------
+    '''
+    convert row value to number
+
+    :rtype: number, or None if value can't be converted
+    '''
+    if _isnumber(value):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 ################################################################################
 class BoolExpr():
 ################################################################################
-    pass
+    '''
+    boolean expression over the columns of a row, see module documentation for syntax
+
+    the expression is parsed when the object is created. Use :meth:`compile` to get a
+    function which evaluates a row, or call the object directly on a dict
+
+    :param expr: expression string
+    '''
+
+    #----------------------------------------------------------------------
+    def __init__(self, expr):
+    #----------------------------------------------------------------------
+        self.expr = expr
+        self.ast = _Parser(expr).parse()
+        self._dictpredicate = None
+
+    #----------------------------------------------------------------------
+    def __reduce__(self):
+    #----------------------------------------------------------------------
+        # compiled functions can't be pickled, so reparse, e.g., in worker process
+        return (BoolExpr, (self.expr,))
+
+    #----------------------------------------------------------------------
+    def __repr__(self):
+    #----------------------------------------------------------------------
+        return 'BoolExpr({!r})'.format(self.expr)
+
+    #----------------------------------------------------------------------
+    def __call__(self, row):
+    #----------------------------------------------------------------------
+        '''
+        evaluate expression for a dict row
+
+        :param row: dict-like row
+        :rtype: boolean
+        '''
+        if self._dictpredicate is None:
+            self._dictpredicate = self.compile()
+        return self._dictpredicate(row)
+
+    #----------------------------------------------------------------------
+    def columns(self):
+    #----------------------------------------------------------------------
+        '''
+        get columns referenced by the expression
+
+        :rtype: list of column names, in order of first reference
+        '''
+        columns = []
+        def add(column):
+            if column not in columns:
+                columns.append(column)
+        def walk(node):
+            kind = node[0]
+            if kind in ['or', 'and', 'not']:
+                for child in node[1:]:
+                    walk(child)
+            elif kind == 'cmp':
+                for operand in node[2:]:
+                    if operand[0] == 'column':
+                        add(operand[1])
+            else:
+                add(node[1])
+        walk(self.ast)
+        return columns
+
+    #----------------------------------------------------------------------
+    def compile(self, fields=None):
+    #----------------------------------------------------------------------
+        '''
+        compile the expression into a function(row)
+
+        :param fields: list of column headers if rows are lists (e.g., from csv.reader), else None if rows are dicts
+        :rtype: function(row) which returns True if row satisfies the expression
+        '''
+        if fields is not None:
+            colndx = {col: ndx for ndx, col in enumerate(fields)}
+        else:
+            colndx = None
+        return self._compile(self.ast, colndx)
+
+    #----------------------------------------------------------------------
+    def _getter(self, column, colndx):
+    #----------------------------------------------------------------------
+        '''
+        get function(row) to retrieve column value, None if missing
+        '''
+        if colndx is None:
+            return lambda row: row.get(column)
+
+        if column not in colndx:
+            raise invalidParameter('{}: column {} not in {}'.format(self.expr, column, list(colndx)))
+        ndx = colndx[column]
+        return lambda row: row[ndx] if ndx < len(row) else None
+
+    #----------------------------------------------------------------------
+    def _compile(self, node, colndx):
+    #----------------------------------------------------------------------
+        '''
+        compile ast node into function(row)
+        '''
+        kind = node[0]
+
+        # evaluate the terms in a flat loop, short circuiting, so long term lists don't nest calls
+        if kind in ('or', 'and'):
+            funcs = tuple(self._compile(n, colndx) for n in node[1:])
+            if len(funcs) == 1:
+                return funcs[0]
+            if kind == 'or':
+                def anyterm(row):
+                    for func in funcs:
+                        if func(row):
+                            return True
+                    return False
+                return anyterm
+            def allterms(row):
+                for func in funcs:
+                    if not func(row):
+                        return False
+                return True
+            return allterms
+
+        if kind == 'not':
+            func = self._compile(node[1], colndx)
+            return lambda row: not func(row)
+
+        if kind == 'null':
+            get = self._getter(node[1], colndx)
+            return lambda row: get(row) in (None, '')
+
+        if kind == 'cmp':
+            return self._compilecmp(node, colndx)
+
+        get = self._getter(node[1], colndx)
+
+        if kind == 'in':
+            values = node[2]
+            strings = frozenset(str(v) for v in values if not _isnumber(v))
+            numbers = frozenset(v for v in values if _isnumber(v))
+            if not numbers:
+                return lambda row: get(row) is not None and str(get(row)) in strings
+            def test(row):
+                value = get(row)
+                if value is None:
+                    return False
+                if str(value) in strings:
+                    return True
+                return _tonumber(value) in numbers
+            return test
+
+        if kind == 'between':
+            low, high = node[2], node[3]
+            if _isnumber(low) and _isnumber(high):
+                def test(row):
+                    value = _tonumber(get(row))
+                    return value is not None and low <= value <= high
+            else:
+                low, high = str(low), str(high)
+                def test(row):
+                    value = get(row)
+                    return value is not None and low <= str(value) <= high
+            return test
+
+        if kind == 'matches':
+            search = re.compile(node[2]).search
+            def test(row):
+                value = get(row)
+                return value is not None and search(str(value)) is not None
+            return test
+
+        raise parseError('{}: unknown node {}'.format(self.expr, kind))
+
+    #----------------------------------------------------------------------
+    def _compilecmp(self, node, colndx):
+    #----------------------------------------------------------------------
+        '''
+        compile comparison node into function(row)
+        '''
+        op, left, right = node[1], node[2], node[3]
+        compare = COMPARISONS[op]
+
+        # literal compared with literal is constant
+        if left[0] == 'literal' and right[0] == 'literal':
+            try:
+                result = bool(compare(left[1], right[1]))
+            except TypeError:
+                result = False
+            return lambda row: result
+
+        # column compared with literal, normalize so column is on the left
+        if left[0] == 'literal' or right[0] == 'literal':
+            if left[0] == 'literal':
+                left, right = right, left
+                compare = {operator.lt: operator.gt, operator.gt: operator.lt,
+                           operator.le: operator.ge, operator.ge: operator.le}.get(compare, compare)
+            get = self._getter(left[1], colndx)
+            literal = right[1]
+            if _isnumber(literal):
+                def test(row):
+                    value = _tonumber(get(row))
+                    return value is not None and compare(value, literal)
+            else:
+                literal = str(literal)
+                def test(row):
+                    value = get(row)
+                    return value is not None and compare(str(value), literal)
+            return test
+
+        # column compared with column, numerically if both convert
+        getleft = self._getter(left[1], colndx)
+        getright = self._getter(right[1], colndx)
+        def test(row):
+            leftvalue, rightvalue = getleft(row), getright(row)
+            if leftvalue is None or rightvalue is None:
+                return False
+            leftnum, rightnum = _tonumber(leftvalue), _tonumber(rightvalue)
+            if leftnum is not None and rightnum is not None:
+                return compare(leftnum, rightnum)
+            return compare(str(leftvalue), str(rightvalue))
+        return test
 
 #----------------------------------------------------------------------
 def main():
@@ -52,9 +522,8 @@ def main():
     unit test goes here
     '''
 
-    
+
 ################################################################################
 ################################################################################
 if __name__ == "__main__":
     main()
-
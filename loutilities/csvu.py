@@ -25,6 +25,7 @@
 # standard
 import unicodedata
 import csv
+from collections import deque
 
 # pypi
 #from IPython.core.debugger import Tracer; debug_here = Tracer()
@@ -69,19 +70,128 @@ def str2num(ustr):
         except ValueError:
             return unicode2ascii(ustr).strip()
 
+# first characters of strings which might convert to a number, and words float() accepts, see _str2str
+NUMSTARTCHARS = frozenset('+-.0123456789')
+NUMWORDS = frozenset(['nan', 'inf', 'infinity'])
+
+#----------------------------------------------------------------------
+def _str2int(ustr):
+#----------------------------------------------------------------------
+    '''
+    str2num specialized for column which usually holds int
+    '''
+    try:
+        return int(ustr)
+    except (TypeError, ValueError):
+        return str2num(ustr)
+
+#----------------------------------------------------------------------
+def _str2float(ustr):
+#----------------------------------------------------------------------
+    '''
+    str2num specialized for column which usually holds float
+    '''
+    # int strings (and nan, inf) don't have these, and str2num would return int for them
+    if ustr is not None and ('.' in ustr or 'e' in ustr or 'E' in ustr):
+        try:
+            return float(ustr)
+        except ValueError:
+            pass
+    return str2num(ustr)
+
+#----------------------------------------------------------------------
+def _str2str(ustr):
+#----------------------------------------------------------------------
+    '''
+    str2num specialized for column which usually holds str
+    '''
+    # only strings which start like a number need to try numeric conversion
+    if ustr is not None:
+        stripped = ustr.strip()
+        first = stripped[:1]
+        if first not in NUMSTARTCHARS and not first.isdigit() and stripped.lower() not in NUMWORDS:
+            return stripped
+    return str2num(ustr)
+
+#----------------------------------------------------------------------
+def inferconverter(values):
+#----------------------------------------------------------------------
+    '''
+    choose a converter equivalent to str2num which is fastest for a column with the sample values
+
+    :param values: sample of column values
+    :rtype: function(ustr)
+    '''
+    types = set()
+    for value in values:
+        if value is None or value == '':
+            continue
+        converted = str2num(value)
+        types.add(type(converted))
+
+    if types == {int}:
+        return _str2int
+    if types and types <= {int, float}:
+        return _str2float
+    return _str2str
+
 #######################################################################
 class DictReaderStr2Num(csv.DictReader):
 #######################################################################
     '''
     extend csv.DictReader to convert strings to numbers 
+
+    if inferrows is set, the first inferrows rows are used to choose a converter for each column
+    which gives the same result as str2num, but avoids trying conversions which are expected
+    to fail. Cells which don't match the column's type fall back to str2num
+
+    :param inferrows: number of rows to examine to infer column types, None to use str2num for each cell
     '''
 
+    #----------------------------------------------------------------------
+    def __init__(self, f, *args, inferrows=None, **kwargs):
+    #----------------------------------------------------------------------
+        super().__init__(f, *args, **kwargs)
+        self.inferrows = inferrows
+        self.converters = None
+        self.inferred = deque()
+
+    #----------------------------------------------------------------------
+    def _infer(self):
+    #----------------------------------------------------------------------
+        '''
+        read the first rows and choose converter for each column
+        '''
+        for i in range(self.inferrows):
+            try:
+                self.inferred.append(csv.DictReader.__next__(self))
+            except StopIteration:
+                break
+
+        self.converters = {}
+        for key in (self.fieldnames or []):
+            self.converters[key] = inferconverter(row.get(key) for row in self.inferred)
+
     #----------------------------------------------------------------------
     def __next__(self):
     #----------------------------------------------------------------------
-        row = csv.DictReader.__next__(self)
+        if self.inferrows is None:
+            row = csv.DictReader.__next__(self)
+            for key in row:
+                row[key] = str2num(row[key])
+            return row
+
+        if self.converters is None:
+            self._infer()
+
+        if self.inferred:
+            row = self.inferred.popleft()
+        else:
+            row = csv.DictReader.__next__(self)
+
+        converters = self.converters
         for key in row:
-            row[key] = str2num(row[key])
+            row[key] = converters.get(key, str2num)(row[key])
         return row
         
 
@@ -9,8 +9,12 @@ import argparse
 import tempfile
 import collections
 import os
+import csv
 from collections import OrderedDict
 from csv import DictReader, DictWriter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from operator import itemgetter
 
 # pypi
 from xlrd import open_workbook
@@ -19,7 +23,8 @@ from openpyxl import load_workbook
 # github
 
 # other
-from sqlalchemy.orm import class_mapper # see http://www.sqlalchemy.org/ written with 0.8.0b2
+from sqlalchemy import or_
+from sqlalchemy.orm import class_mapper, Session # see http://www.sqlalchemy.org/ written with 0.8.0b2
 
 # home grown
 from . import version
@@ -51,18 +56,14 @@ class _objdict(dict):
             raise AttributeError("No such attribute: " + name)
 
 #----------------------------------------------------------------------
-def record2csv(inrecs, mapping, outfile=None, encoding=None): 
+def _compilemapping(mapping):
 #----------------------------------------------------------------------
     '''
-    convert list of dict or object records to a csv list or file based on a specified mapping
-    
-    :param inrecs: list of dicts or objects
-    :param mapping: OrderedDict {'outfield1':'infield1', 'outfield2':outfunction(inrec), ...} or ['inoutfield1', 'inoutfield2', ...]
-    :param outfile: optional output file
-    :param encoding: optional file encoding
-    :rtype: lines from output file
-    '''
+    compile record2csv mapping into output fields and a getter function for each
 
+    :param mapping: see record2csv()
+    :rtype: (outfields, getters), getters are function(inrec)
+    '''
     # analyze mapping for outfields
     if isinstance(mapping, list):
         mappingtype = list
@@ -70,48 +71,149 @@ def record2csv(inrecs, mapping, outfile=None, encoding=None):
         mappingtype = dict
     else:
         raise invalidParameter(
-            "invalid mapping type {}. mapping type must be list, dict or OrderedDict").with_traceback(
-            format(type(mapping)))
+            "invalid mapping type {}. mapping type must be list, dict or OrderedDict".format(type(mapping)))
 
     outfields = []
+    getters = []
     for outfield in mapping:
         invalue = mapping[outfield] if mappingtype==dict else outfield
 
-        if not isinstance(invalue, str) and not callable(invalue):
+        if isinstance(invalue, str):
+            getters.append(lambda inrec, infield=invalue: getattr(inrec, infield, None))
+
+        elif callable(invalue):
+            # a function call is requested
+            getters.append(invalue)
+
+        else:
             raise invalidParameter('invalid mapping {}. mapping values must be str or function'.format(invalue))
 
         outfields.append(outfield)
 
+    return outfields, getters
+
+#----------------------------------------------------------------------
+def record2csv(inrecs, mapping, outfile=None, encoding=None, streaming=False):
+#----------------------------------------------------------------------
+    '''
+    convert list of dict or object records to a csv list or file based on a specified mapping
+
+    if streaming is set, each record is written to outfile as it is converted rather than being collected, so
+    inrecs may be a generator of any length
+    
+    :param inrecs: list (or iterable) of dicts or objects
+    :param mapping: OrderedDict {'outfield1':'infield1', 'outfield2':outfunction(inrec), ...} or ['inoutfield1', 'inoutfield2', ...]
+    :param outfile: optional output file, if streaming may also be a file-like object (opened with newline='')
+    :param encoding: optional file encoding
+    :param streaming: if True, write directly to outfile
+    :rtype: lines from output file, or None if streaming
+    '''
+    outfields, getters = _compilemapping(mapping)
+
+    if streaming:
+        if outfile is None:
+            raise parameterError('outfile required for streaming')
+        if isinstance(outfile, str):
+            with open(outfile, 'w', newline='', encoding=encoding) as out:
+                _writerecords(inrecs, outfields, getters, out)
+        else:
+            _writerecords(inrecs, outfields, getters, outfile)
+        return None
+
     # create writeable list, csv file
     outreclist = wlist()
-    coutreclist = DictWriter(outreclist, outfields)
-    coutreclist.writeheader()
+    _writerecords(inrecs, outfields, getters, outreclist)
+
+    # write file if desired
+    if outfile:
+        with open(outfile, 'w', newline='', encoding=encoding) as out:
+            out.writelines(outreclist)
+
+    return outreclist
+
+#----------------------------------------------------------------------
+def _writerecords(inrecs, outfields, getters, out):
+#----------------------------------------------------------------------
+    '''
+    write header and records to out
+
+    :param inrecs: iterable of dicts or objects
+    :param outfields: header fields
+    :param getters: function(inrec) for each field, from _compilemapping()
+    :param out: object with write method
+    '''
+    writer = csv.writer(out)
+    writer.writerow(outfields)
 
     for inrec in inrecs:
         # convert to object if necessary
         if isinstance(inrec, dict):
             inrec = _objdict(inrec)
 
-        outrow = {}
-        for outfield in mapping:
-            infield = mapping[outfield] if mappingtype==dict else outfield
-            if isinstance(infield, str):
-                outvalue = getattr(inrec, infield, None)
+        writer.writerow([getter(inrec) for getter in getters])
 
-            else:
-                # a function call is requested
-                outvalue = infield(inrec)
+#----------------------------------------------------------------------
+def _sheet2csv(sheet, outfile, hdrmap=None, encoding=None):
+#----------------------------------------------------------------------
+    '''
+    stream rows from an openpyxl worksheet to a csv file
 
-            outrow[outfield] = outvalue
-        
-        coutreclist.writerow(outrow)
+    :param sheet: worksheet, normally from a read-only workbook
+    :param outfile: csv file name
+    :param hdrmap: maps input header to csv header -- if None, input header is used as csv header
+    :param encoding: optional file encoding
+    :rtype: True if file was written, False if sheet is empty
+    '''
+    # some writers save a stale <dimension>, which would truncate a read-only sheet
+    if hasattr(sheet, 'reset_dimensions'):
+        sheet.reset_dimensions()
+    rows = sheet.iter_rows(values_only=True)
+
+    # get header
+    inhdr = next(rows, None)
+    if inhdr is None:
+        return False    # skip empty sheets
+    inhdr = list(inhdr)
+
+    if hdrmap is not None:
+        # NOTE: this has the effect of filtering input columns
+        outhdr = [hdrmap[k] for k in hdrmap]
+    else:
+        hdrmap = dict(list(zip(inhdr,inhdr)))
+        outhdr = inhdr
 
-    # write file if desired
-    if outfile:
-        with open(outfile, 'w', newline='', encoding=encoding) as out:
-            out.writelines(outreclist)
+    # plan which input columns go to which output columns
+    plan = [(incol, hdrmap[inname]) for incol, inname in enumerate(inhdr) if inname in hdrmap]
 
-    return outreclist
+    # create output csv file and write header
+    with open(outfile, 'w', newline='', encoding=encoding) as OUT:
+        writer = DictWriter(OUT,outhdr)
+        writer.writeheader()
+
+        # copy all the remaining rows in the original sheet to the csv file
+        for row in rows:
+            writer.writerow({outname: row[incol] for incol, outname in plan if incol < len(row)})
+
+    return True
+
+#----------------------------------------------------------------------
+def _xlsxsheet2csv(filename, sheetname, outfile, hdrmap=None, encoding=None):
+#----------------------------------------------------------------------
+    '''
+    worker process function to convert a single xlsx sheet to a csv file
+
+    :param filename: xlsx file name
+    :param sheetname: name of sheet to convert
+    :param outfile: csv file name
+    :param hdrmap: maps input header to csv header -- if None, input header is used as csv header
+    :param encoding: optional file encoding
+    :rtype: True if file was written, False if sheet is empty
+    '''
+    wb = load_workbook(filename, read_only=True)
+    try:
+        return _sheet2csv(wb[sheetname], outfile, hdrmap, encoding)
+    finally:
+        wb.close()
 
 ########################################################################
 class Base2Csv():
@@ -170,48 +272,39 @@ class Xls2Csv(Base2Csv):
     :param filename: name of file to convert
     :param outdir: directory to put output file(s) -- if None, temporary directory is used
     :param hdrmap: maps input header to csv header -- if None, input header is used as csv header
+    :param workers: for xlsx files, number of worker processes used to convert sheets in parallel
     '''
 
-    def _handle_xlsx(self, filename, hdrmap=None):
+    def _handle_xlsx(self, filename, hdrmap=None, workers=1):
         """
         handle xlsx file
 
         :param filename: xlsx file name
         :param hdrmap: maps input header to csv header -- if None, input header is used as csv header
+        :param workers: number of worker processes to convert sheets in parallel, 1 to convert serially
         """
         # go through each sheet, and save as csv file
-        # from http://www.gossamer-threads.com/lists/python/python/833610
-        wb = load_workbook(filename) 
-        for name in wb.sheetnames: 
-            sheet = wb[name] 
-            if len(list(sheet.rows)) == 0: continue   # skip empty sheets
-            
-            # get header
-            inhdr = [c.value for c in next(sheet.rows)]
-            if hdrmap is not None:
-                # NOTE: this has the effect of filtering input columns
-                outhdr = [hdrmap[k] for k in hdrmap]
-            else:
-                hdrmap = dict(list(zip(inhdr,inhdr)))
-                outhdr = inhdr
-                
-            # create output csv file and write header
-            self.files[name] = '{0}/{1}.csv'.format(self.dir,name)
-            OUT = open(self.files[name], 'w', newline='', encoding=self.encoding)
-            writer = DictWriter(OUT,outhdr)
-            writer.writeheader()
-            
-            # copy all the remaining rows in the original sheet to the csv file
-            for row in sheet.iter_rows(min_row=1, values_only=True):
-                inrow = dict(list(zip(inhdr,row)))
-                outrow = {}
-                for incol in inhdr:
-                    if incol in hdrmap:
-                        outrow[hdrmap[incol]] = inrow[incol]
-                writer.writerow(outrow)
-            
-            # we're done with this sheet
-            OUT.close()
+        # workbook is read in read-only mode so rows are streamed from the file rather than loaded
+        wb = load_workbook(filename, read_only=True)
+        sheetnames = wb.sheetnames
+        outfiles = ['{0}/{1}.csv'.format(self.dir,name) for name in sheetnames]
+
+        if workers > 1 and len(sheetnames) > 1:
+            wb.close()
+            with ProcessPoolExecutor(max_workers=min(workers, len(sheetnames))) as executor:
+                written = list(executor.map(_xlsxsheet2csv, repeat(filename), sheetnames, outfiles,
+                                            repeat(hdrmap), repeat(self.encoding)))
+        else:
+            try:
+                written = [_sheet2csv(wb[name], outfile, hdrmap, self.encoding)
+                           for name, outfile in zip(sheetnames, outfiles)]
+            finally:
+                wb.close()
+
+        # empty sheets are skipped
+        for name, outfile, sheetwritten in zip(sheetnames, outfiles, written):
+            if sheetwritten:
+                self.files[name] = outfile
  
     def _handle_xls(self, filename, hdrmap=None):
         """
@@ -254,7 +347,7 @@ class Xls2Csv(Base2Csv):
             # we're done with this sheet
             OUT.close()
 
-    def __init__(self, filename, outdir=None, hdrmap=None):
+    def __init__(self, filename, outdir=None, hdrmap=None, workers=1):
         
         # only handle xlsx these days
 
@@ -263,7 +356,7 @@ class Xls2Csv(Base2Csv):
         
         ext = filename.split('.')[-1]
         if ext.lower() == 'xlsx':
-            self._handle_xlsx(filename, hdrmap=hdrmap)
+            self._handle_xlsx(filename, hdrmap=hdrmap, workers=workers)
         
         elif ext.lower() == 'xls':
             self._handle_xls(filename, hdrmap=hdrmap)
@@ -294,7 +387,7 @@ class Db2Csv(Base2Csv):
         self.encoding = encoding
         
     #----------------------------------------------------------------------
-    def addtable(self, name, session, model, hdrmap=None, **kwargs):
+    def addtable(self, name, session, model, hdrmap=None, yield_per=None, **kwargs):
     #----------------------------------------------------------------------
         '''
         insert a new element or update an existing on based on kwargs query
@@ -312,6 +405,9 @@ class Db2Csv(Base2Csv):
         :param session: session within which update occurs
         :param model: table model
         :param hdrmap: maps input table column names to csv header -- if None, input table column names are used as csv header
+        :param yield_per: if set, stream the table using a server side cursor, fetching yield_per rows at a time. Only
+            the mapped columns are selected, and rows are not loaded as model objects, so memory use doesn't grow
+            with the size of the table
         :param **kwargs: used for db filter
         '''
         # TODO: currently this only handles flat tables, i.e., if workbook originally was used to make
@@ -319,6 +415,45 @@ class Db2Csv(Base2Csv):
         # Not sure what it would take to recreate the csv in that case, but probably has something to do
         # with Mapper.col and Mapper.col.attr -- wish sqlalchemy docs were a bit more clear on this
     
+        inhdr, hdrmap, outhdr = self._tablehdr(model, hdrmap)
+
+        # stream the table if requested
+        if yield_per:
+            self._streamtable(name, session, model, inhdr, hdrmap, outhdr, yield_per, **kwargs)
+            return
+
+        # create output csv file and write header
+        self.files[name] = '{0}/{1}.csv'.format(self.dir,name)
+        OUT = open(self.files[name], 'w', newline='', encoding=self.encoding)
+        writer = DictWriter(OUT,outhdr)
+        writer.writeheader()
+            
+        # copy all the rows in the table to the csv file
+        for inrow in session.query(model).filter_by(**kwargs).all():
+            outrow = {}
+            for incol in inhdr:
+                if incol in hdrmap:
+                    outcol = hdrmap[incol]
+                    if isinstance(outcol, str):
+                        outrow[outcol] = getattr(inrow,incol)
+                    # must be dict, call function(session,value) to determine value transformation
+                    else:
+                        # tranform input for each configured output column
+                        for subk in outcol:
+                            outrow[subk] = outcol[subk](session,getattr(inrow,incol))
+            writer.writerow(outrow)
+        
+        # we're done with this sheet
+        OUT.close()
+
+    #----------------------------------------------------------------------
+    def _tablehdr(self, model, hdrmap):
+    #----------------------------------------------------------------------
+        '''
+        determine input and output headers for table, see addtable() for parameters
+
+        :rtype: (inhdr, hdrmap, outhdr)
+        '''
         # get the column names from the model
         inhdr = []
         for col in class_mapper(model).columns:
@@ -344,30 +479,235 @@ class Db2Csv(Base2Csv):
             hdrmap = dict(list(zip(inhdr,inhdr)))
             outhdr = inhdr
 
+        return inhdr, hdrmap, outhdr
+
+    #----------------------------------------------------------------------
+    def addtables(self, tables, session, workers=4, yield_per=None):
+    #----------------------------------------------------------------------
+        '''
+        export several tables concurrently, each using its own session with a connection from the engine pool
+
+        tables is a list of dicts, each with keys matching the addtable() parameters
+        
+            {'name':name, 'model':model, 'hdrmap':hdrmap, 'filters':{column:value,...}}
+            
+            where hdrmap and filters are optional
+
+        functions in hdrmap are called with the worker's session. Output files are listed in getfiles()
+        in the order of tables
+
+        :param tables: list of tables to export, see above
+        :param session: session used to determine the engine (bind) for each model
+        :param workers: maximum number of tables exported at the same time
+        :param yield_per: if set, stream each table, see addtable()
+        '''
+        # reserve file order to match tables, regardless of order of completion
+        for table in tables:
+            self.files[table['name']] = '{0}/{1}.csv'.format(self.dir,table['name'])
+
+        def addtable(table):
+            engine = session.get_bind(mapper=class_mapper(table['model']))
+            with Session(bind=engine) as tablesession:
+                self.addtable(table['name'], tablesession, table['model'], table.get('hdrmap'), yield_per=yield_per,
+                              **table.get('filters', {}))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # raise the first exception, if any
+            for result in executor.map(addtable, tables):
+                pass
+
+    #----------------------------------------------------------------------
+    def _streamtable(self, name, session, model, inhdr, hdrmap, outhdr, yield_per, criteria=(), keys=None, **kwargs):
+    #----------------------------------------------------------------------
+        '''
+        stream table rows to csv file, see addtable() for other parameters
+
+        :param criteria: additional filter criteria for query
+        :param keys: if set, only rows with primary key tuple in keys are written
+        '''
+        # only select the columns which are mapped
+        incols = [incol for incol in inhdr if incol in hdrmap]
+        selectcols = [getattr(model, incol) for incol in incols]
+
+        # primary key columns follow the mapped columns, if needed
+        if keys is not None:
+            pkcols = self._pkcols(model)
+            if len(pkcols) == 1:
+                keyndx = lambda inrow, ndx=len(incols): (inrow[ndx],)
+            else:
+                keyndx = itemgetter(*range(len(incols), len(incols)+len(pkcols)))
+            selectcols += pkcols
+
+        # precompute plan of (row index, output index, function) for each output column, function is None to copy
+        # the value, else function(session,value) to transform it
+        outndx = {}
+        for ndx, outcol in enumerate(outhdr):
+            outndx.setdefault(outcol, []).append(ndx)
+        plan = []
+        for rowndx, incol in enumerate(incols):
+            outcol = hdrmap[incol]
+            if isinstance(outcol, str):
+                plan += [(rowndx, ndx, None) for ndx in outndx[outcol]]
+            # must be dict, call function(session,value) to determine value transformation
+            else:
+                for subk in outcol:
+                    plan += [(rowndx, ndx, outcol[subk]) for ndx in outndx[subk]]
+
         # create output csv file and write header
         self.files[name] = '{0}/{1}.csv'.format(self.dir,name)
-        OUT = open(self.files[name], 'w', newline='', encoding=self.encoding)
-        writer = DictWriter(OUT,outhdr)
-        writer.writeheader()
-            
-        # copy all the rows in the table to the csv file
-        for inrow in session.query(model).filter_by(**kwargs).all():
-            outrow = {}
-            for incol in inhdr:
-                if incol in hdrmap:
-                    outcol = hdrmap[incol]
-                    if isinstance(outcol, str):
-                        outrow[outcol] = getattr(inrow,incol)
-                    # must be dict, call function(session,value) to determine value transformation
-                    else:
-                        # tranform input for each configured output column
-                        for subk in outcol:
-                            outrow[subk] = outcol[subk](session,getattr(inrow,incol))
-            writer.writerow(outrow)
-        
-        # we're done with this sheet
-        OUT.close()
+        with open(self.files[name], 'w', newline='', encoding=self.encoding) as OUT:
+            writer = csv.writer(OUT)
+            writer.writerow(outhdr)
+
+            # copy all the rows in the table to the csv file
+            query = session.query(*selectcols).filter_by(**kwargs).filter(*criteria)
+            for inrow in query.yield_per(yield_per):
+                if keys is not None and keyndx(inrow) not in keys: continue
+                outrow = [''] * len(outhdr)
+                for rowndx, ndx, function in plan:
+                    value = inrow[rowndx]
+                    outrow[ndx] = value if function is None else function(session, value)
+                writer.writerow(outrow)
         
+    #----------------------------------------------------------------------
+    def _pkcols(self, model):
+    #----------------------------------------------------------------------
+        '''
+        get primary key attributes for model
+
+        :param model: table model
+        :rtype: list of model attributes
+        '''
+        mapper = class_mapper(model)
+        return [getattr(model, mapper.get_property_by_column(col).key) for col in mapper.primary_key]
+
+    #----------------------------------------------------------------------
+    def addtabledelta(self, name, session, model, hdrmap=None, watermark='updated_at', yield_per=1000, **kwargs):
+    #----------------------------------------------------------------------
+        '''
+        export only the rows which are new or changed since the last export of this table to outdir, and
+        a manifest of the rows which were deleted
+
+        the watermark column (e.g., AuditMixin.updated_at, or version_id) is saved with the primary key of
+        each row in {outdir}/{name}.watermark.csv. A row is exported if its watermark value differs from
+        the saved value. The first export includes all rows
+
+        getfiles() gets {name:changed rows file, name.deleted:deleted rows file}. The deleted rows file
+        has the primary key column names as header. Use :func:`mergedelta` to update a full snapshot
+
+        :param name: 'sheet' name, used to name output files
+        :param session: session within which update occurs
+        :param model: table model
+        :param hdrmap: see addtable(). For mergedelta() the output should include the primary key columns
+        :param watermark: name of column which changes whenever the row changes
+        :param yield_per: tables are streamed, fetching yield_per rows at a time
+        :param **kwargs: used for db filter
+        '''
+        if self.tempdir:
+            raise parameterError('{}: outdir required to save watermark for incremental export'.format(name))
+
+        inhdr, hdrmap, outhdr = self._tablehdr(model, hdrmap)
+        pkcols = self._pkcols(model)
+        pknames = [col.key for col in pkcols]
+        wmcol = getattr(model, watermark)
+
+        # read previous watermarks, {(pkstr, ...): wmstr, ...}
+        wmfile = '{0}/{1}.watermark.csv'.format(self.dir,name)
+        prevwm = {}
+        if os.path.exists(wmfile):
+            with open(wmfile, newline='', encoding='utf-8') as WM:
+                wmreader = csv.reader(WM)
+                next(wmreader)  # skip header
+                for wmrow in wmreader:
+                    prevwm[tuple(wmrow[:-1])] = wmrow[-1]
+
+        # compare current watermarks, saving new watermarks as we go
+        changed = set()
+        minwatermark = None
+        nullwatermark = False
+        with open(wmfile+'.new', 'w', newline='', encoding='utf-8') as WM:
+            wmwriter = csv.writer(WM)
+            wmwriter.writerow(pknames + [watermark])
+            query = session.query(*pkcols, wmcol).filter_by(**kwargs)
+            for inrow in query.yield_per(yield_per):
+                key = tuple(inrow[:-1])
+                wmrow = ['' if v is None else str(v) for v in inrow]
+                strkey = tuple(wmrow[:-1])
+                if prevwm.pop(strkey, None) != wmrow[-1]:
+                    changed.add(key)
+                    value = inrow[-1]
+                    if value is None:
+                        nullwatermark = True
+                    elif minwatermark is None or value < minwatermark:
+                        minwatermark = value
+                wmwriter.writerow(wmrow)
+
+        # anything left in prevwm has been deleted
+        deletedname = '{}.deleted'.format(name)
+        self.files[deletedname] = '{0}/{1}.csv'.format(self.dir,deletedname)
+        with open(self.files[deletedname], 'w', newline='', encoding=self.encoding) as DEL:
+            delwriter = csv.writer(DEL)
+            delwriter.writerow(pknames)
+            delwriter.writerows(prevwm)
+
+        # nothing changed, so no need to query the table again
+        if not changed:
+            self.files[name] = '{0}/{1}.csv'.format(self.dir,name)
+            with open(self.files[name], 'w', newline='', encoding=self.encoding) as OUT:
+                csv.writer(OUT).writerow(outhdr)
+
+        # only need to look at rows at or after the earliest changed watermark, or with no watermark
+        else:
+            if minwatermark is None:
+                criteria = [wmcol.is_(None)]
+            elif nullwatermark:
+                criteria = [or_(wmcol >= minwatermark, wmcol.is_(None))]
+            else:
+                criteria = [wmcol >= minwatermark]
+            self._streamtable(name, session, model, inhdr, hdrmap, outhdr, yield_per, criteria=criteria, keys=changed,
+                              **kwargs)
+
+        # exports are written, so it's safe to save the new watermarks
+        os.replace(wmfile+'.new', wmfile)
+
+#----------------------------------------------------------------------
+def mergedelta(snapshotfile, deltafile, deletedfile, outfile, keyfields, encoding=None):
+#----------------------------------------------------------------------
+    '''
+    merge the output of Db2Csv.addtabledelta() into a full snapshot of the table
+
+    rows in the snapshot are replaced by changed rows with the same key, new rows are appended, and
+    deleted rows are removed
+
+    :param snapshotfile: previous full snapshot csv file
+    :param deltafile: changed rows csv file
+    :param deletedfile: deleted rows csv file
+    :param outfile: merged snapshot csv file, may be the same as snapshotfile
+    :param keyfields: list of snapshot columns holding the primary key, in the order of the deleted file columns
+    :param encoding: optional file encoding
+    '''
+    keyget = lambda row: tuple(row[k] for k in keyfields)
+
+    with open(snapshotfile, newline='', encoding=encoding) as SNAP:
+        snapreader = DictReader(SNAP)
+        fieldnames = snapreader.fieldnames
+        rows = OrderedDict((keyget(row), row) for row in snapreader)
+
+    with open(deltafile, newline='', encoding=encoding) as DELTA:
+        for row in DictReader(DELTA):
+            rows[keyget(row)] = row
+
+    with open(deletedfile, newline='', encoding=encoding) as DEL:
+        delreader = csv.reader(DEL)
+        next(delreader)  # skip header
+        for key in delreader:
+            rows.pop(tuple(key), None)
+
+    with open(outfile, 'w', newline='', encoding=encoding) as OUT:
+        writer = DictWriter(OUT, fieldnames)
+        writer.writeheader()
+        writer.writerows(rows.values())
+
 ###############################################################################
 class wlist(list):
 ###############################################################################
@@ -38,6 +38,11 @@ import csv
 import textwrap
 import json
 import sys
+import os
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
 # pypi
 
@@ -47,9 +52,276 @@ import sys
 
 # home grown
 from . import version
+from .boolexpr import BoolExpr, invalidParameter as boolexprInvalidParameter
 
 class invalidParameter(Exception): pass
 
+# parallel filtering splits the file into chunks of about CHUNKSIZE bytes, scanning BLOCKSIZE bytes at a time
+CHUNKSIZE = 16*1024*1024
+BLOCKSIZE = 1024*1024
+
+#----------------------------------------------------------------------
+def normalizefilter(filt):
+#----------------------------------------------------------------------
+    '''
+    normalize filter to list of dicts, or BoolExpr
+
+    :param filt: dict or list of dicts, or json string representing these, or BoolExpr or expression string
+    :rtype: list of dicts, or BoolExpr
+    '''
+    if isinstance(filt, str):
+        try:
+            filt = json.loads(filt)
+        except ValueError:
+            filt = BoolExpr(filt)
+    if isinstance(filt, BoolExpr):
+        return filt
+    if not isinstance(filt, list):
+        filt = [filt]
+    for f in filt:
+        if not isinstance(f, dict):
+            raise invalidParameter('FILTER must be dict or list of dicts')
+    return filt
+
+#----------------------------------------------------------------------
+def compilefilter(filt, hdrlist):
+#----------------------------------------------------------------------
+    '''
+    compile filter into a predicate over csv.reader rows
+
+    all items within a dict must match (AND function), and a row passes if any dict
+    matches (OR function). Dicts which test the same columns are combined into a single
+    set lookup
+
+    filt may instead be a :class:`loutilities.boolexpr.BoolExpr`, or an expression string
+    which isn't json
+
+    :param filt: dict or list of dicts, or json string representing these, or BoolExpr or expression string
+    :param hdrlist: list of column headers in the file
+    :rtype: function(row) which returns True if the row passes the filter
+    '''
+    filt = normalizefilter(filt)
+    if isinstance(filt, BoolExpr):
+        try:
+            return filt.compile(hdrlist)
+        except boolexprInvalidParameter as e:
+            raise invalidParameter(str(e))
+
+    # an empty list matches nothing
+    if not filt:
+        return lambda row: False
+
+    # an empty dict matches everything
+    if any(len(f) == 0 for f in filt):
+        return lambda row: True
+
+    # index for each column, if duplicated the last one wins as with csv.DictReader
+    colndx = {col: ndx for ndx, col in enumerate(hdrlist)}
+
+    # group the dicts by the columns they test, {(ndx, ...): [(value, ...), ...], ...}
+    groups = {}
+    for f in filt:
+        for col in f:
+            if col not in colndx:
+                raise invalidParameter('FILTER column {} not in header {}'.format(col, hdrlist))
+        ndxs = tuple(sorted(colndx[col] for col in f))
+        values = dict((colndx[col], f[col]) for col in f)
+        groups.setdefault(ndxs, []).append(tuple(values[ndx] for ndx in ndxs))
+
+    tests = []
+    for ndxs in groups:
+        # single column compares scalars
+        if len(ndxs) == 1:
+            getter = itemgetter(ndxs[0])
+            targets = [t[0] for t in groups[ndxs]]
+        else:
+            getter = itemgetter(*ndxs)
+            targets = groups[ndxs]
+        try:
+            targets = frozenset(targets)
+        except TypeError:
+            pass    # unhashable filter value, e.g., list, use list membership
+        tests.append((getter, targets))
+
+    # short rows are padded with None, as with csv.DictReader
+    numcols = max(ndx for ndxs in groups for ndx in ndxs) + 1
+    def predicate(row):
+        if len(row) < numcols:
+            row = row + [None] * (numcols - len(row))
+        for getter, targets in tests:
+            if getter(row) in targets:
+                return True
+        return False
+
+    return predicate
+
+#----------------------------------------------------------------------
+def filtercsv(filt, infile, outfile):
+#----------------------------------------------------------------------
+    '''
+    filter csv infile to outfile
+
+    the header line is always copied to outfile. Rows which pass are written
+    padded to the length of the header, as csv.DictWriter would write them
+
+    :param filt: dict or list of dicts, or json string representing these, see :func:`compilefilter`
+    :param infile: iterable of lines, e.g., file opened with newline=''
+    :param outfile: object with write method
+    '''
+    # get the header line, which is always sent to the output file
+    hdr = next(infile)
+    outfile.write(hdr)
+
+    # use csv to get a list of the hdr, to handle any errant commas
+    H = csv.reader([hdr])
+    hdrlist = next(H)
+    numcols = len(hdrlist)
+
+    predicate = compilefilter(filt, hdrlist)
+
+    _filterrows(predicate, numcols, csv.reader(infile), csv.writer(outfile))
+
+#----------------------------------------------------------------------
+def _filterrows(predicate, numcols, IN, OUT):
+#----------------------------------------------------------------------
+    '''
+    write rows from IN which pass predicate to OUT
+
+    :param predicate: function(row) from compilefilter()
+    :param numcols: number of columns in header
+    :param IN: csv.reader
+    :param OUT: csv.writer
+    '''
+    # for each input line, check against the filter, and if match found, send to output
+    for row in IN:
+        # blank lines are skipped, as csv.DictReader does
+        if not row:
+            continue
+        if predicate(row):
+            if len(row) < numcols:
+                row = row + [''] * (numcols - len(row))
+            OUT.writerow(row)
+
+#----------------------------------------------------------------------
+def _rowranges(filename, chunksize, blocksize=BLOCKSIZE):
+#----------------------------------------------------------------------
+    '''
+    split file into byte ranges which end on row boundaries
+
+    a newline is a row boundary if it is preceded by an even number of quote characters,
+    i.e., it is not within a quoted field. This requires an ascii compatible encoding, e.g.,
+    utf-8 or latin-1
+
+    :param filename: name of csv file
+    :param chunksize: approximate number of bytes in each range
+    :param blocksize: number of bytes to read at a time while scanning
+    :rtype: list of (start, end), the first range is the header row
+    '''
+    ranges = []
+    with open(filename, 'rb') as IN:
+        size = os.fstat(IN.fileno()).st_size
+        rangestart = 0
+        target = 0          # header is first range
+        blockstart = 0
+        parity = 0          # number of quotes before blockstart, modulo 2
+        while target < size:
+            block = IN.read(blocksize)
+            if not block:
+                break
+            blockend = blockstart + len(block)
+
+            # find boundaries within this block
+            while target < blockend:
+                newline = block.find(b'\n', max(target, blockstart) - blockstart)
+                while newline != -1 and (parity + block.count(b'"', 0, newline)) % 2:
+                    newline = block.find(b'\n', newline + 1)
+
+                # no boundary in the rest of this block, keep looking in the next
+                if newline == -1:
+                    target = blockend
+                    break
+
+                boundary = blockstart + newline + 1
+                ranges.append((rangestart, boundary))
+                rangestart = boundary
+                target = boundary + chunksize
+
+            parity = (parity + block.count(b'"')) % 2
+            blockstart = blockend
+
+        if rangestart < size:
+            ranges.append((rangestart, size))
+
+    return ranges
+
+#----------------------------------------------------------------------
+def _filterrange(filt, hdrlist, filename, start, end, encoding):
+#----------------------------------------------------------------------
+    '''
+    worker process function, filter a byte range of a csv file
+
+    :param filt: normalized filter, see normalizefilter()
+    :param hdrlist: list of column headers in the file
+    :param filename: name of csv file
+    :param start: offset of first byte in range
+    :param end: offset of byte after range
+    :param encoding: file encoding
+    :rtype: csv text for the rows which pass the filter
+    '''
+    with open(filename, 'rb') as IN:
+        IN.seek(start)
+        text = IN.read(end - start).decode(encoding, errors='replace')
+
+    predicate = compilefilter(filt, hdrlist)
+    out = io.StringIO(newline='')
+    _filterrows(predicate, len(hdrlist), csv.reader(io.StringIO(text, newline='')), csv.writer(out))
+    return out.getvalue()
+
+#----------------------------------------------------------------------
+def filtercsvparallel(filt, filename, outfile, workers, chunksize=CHUNKSIZE, encoding='utf-8'):
+#----------------------------------------------------------------------
+    '''
+    filter csv file to outfile, using worker processes for chunks of the file
+
+    output is the same as :func:`filtercsv`, in the original row order. The file is split into
+    byte ranges on row boundaries, correctly handling quoted newlines, which requires an ascii
+    compatible encoding, e.g., utf-8 or latin-1
+
+    :param filt: dict or list of dicts, or json string representing these, see :func:`compilefilter`
+    :param filename: name of csv file
+    :param outfile: object with write method
+    :param workers: number of worker processes
+    :param chunksize: approximate number of bytes filtered by a worker at a time
+    :param encoding: file encoding
+    '''
+    filt = normalizefilter(filt)
+    ranges = _rowranges(filename, chunksize)
+    if not ranges:
+        return
+
+    # get the header line, which is always sent to the output file
+    hdrstart, hdrend = ranges.pop(0)
+    with open(filename, 'rb') as IN:
+        hdr = IN.read(hdrend - hdrstart).decode(encoding, errors='replace')
+    outfile.write(hdr)
+
+    # use csv to get a list of the hdr, to handle any errant commas
+    H = csv.reader(io.StringIO(hdr, newline=''))
+    hdrlist = next(H)
+
+    # check filter before starting workers
+    compilefilter(filt, hdrlist)
+
+    # write results in order, limiting the number of results waiting to be written
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in ranges:
+            pending.append(executor.submit(_filterrange, filt, hdrlist, filename, start, end, encoding))
+            if len(pending) >= 2 * workers:
+                outfile.write(pending.popleft().result())
+        while pending:
+            outfile.write(pending.popleft().result())
+
 #----------------------------------------------------------------------
 def main():
 #----------------------------------------------------------------------
@@ -66,63 +338,46 @@ def main():
             file (AND function)
             
             If the filter needs to test that a value of the filter and the row NOT
-            match, TBD
+            match, use a boolean expression (see below)
             
             if a list of dicts is provided, the row passes if any of the dicts match
             (OR function)
+
+            FILTER may instead be a boolean expression, e.g.,
+
+                gender = 'F' and age between 40 and 49 and not (city in ('Frederick', 'Walkersville'))
+
+            see loutilities.boolexpr for the expression syntax
             ''')
     parser = argparse.ArgumentParser(prog='filtercsv',
                                      description=descr,
-                                     formatter_class=argparse.RawDescriptionHelpFormatter,
-                                     version='{0} {1}'.format('loutilities',version.__version__))
-    parser.add_argument('filter',help='list of dicts or single dict. All items within dict must match for any dict in the list to pass filter')
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--version', action='version', version='{0} {1}'.format('loutilities',version.__version__))
+    parser.add_argument('filter',help='list of dicts or single dict. All items within dict must match for any dict in the list to pass filter. Or boolean expression')
+    parser.add_argument('-i', '--infile', help='read INFILE rather than stdin')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of worker processes, requires --infile (default %(default)s)')
+    parser.add_argument('-e', '--encoding', default='utf-8', help='encoding of INFILE (default %(default)s)')
     args = parser.parse_args()
+    if args.workers > 1 and not args.infile:
+        parser.error('--workers requires --infile')
     
     # convert stdout to binary mode if on windows
     if sys.platform == "win32":
         import os, msvcrt
         msvcrt.setmode(sys.stdout.fileno(), os.O_BINARY)
 
-    # normalize filter to list of dicts
-    #print 'FILTER={}'.format(args.filter)
-    filt = json.loads(args.filter)
-    if not isinstance(filt, list):
-        filt = [filt]
-    for f in filt:
-        if not isinstance(f, dict):
-            raise invalidParameter('FILTER must be dict or list of dicts')
-    
-    # get the header line, which is always sent to the output file
-    hdr = next(sys.stdin)
-    sys.stdout.write(hdr)
+    # check filter before reading anything
+    filt = normalizefilter(args.filter)
 
-    # use csv to get a list of the hdr, to handle any errant commas
-    H = csv.reader([hdr])
-    hdrlist = next(H)
-    
-    # parse the rest of stdin as a DictReader, stdout as DictWriter
-    IN = csv.DictReader(sys.stdin,fieldnames=hdrlist)
-    OUT = csv.DictWriter(sys.stdout,hdrlist)
-    
-    # for each input line, check against all the filters
-    for line in IN:
-        for f in filt:
-            # hope for the best
-            match = True
-            
-            # AND function -- all within dict must match
-            for col in list(f.keys()):
-                if f[col] != line[col]:
-                    match = False
-                    break
-            
-            # OR function -- match found within any of the dicts means pass through the filter
-            if match:
-                break
-        
-        # if match found, send to output
-        if match:
-            OUT.writerow(line)
+    if args.workers > 1:
+        filtercsvparallel(filt, args.infile, sys.stdout, args.workers, encoding=args.encoding)
+
+    elif args.infile:
+        with open(args.infile, newline='', encoding=args.encoding, errors='replace') as IN:
+            filtercsv(filt, IN, sys.stdout)
+
+    else:
+        filtercsv(filt, sys.stdin, sys.stdout)
             
     # clean up
     sys.stdin.close()
@@ -0,0 +1,245 @@
+#!/usr/bin/python
+###########################################################################################
+#   namematch - blocking index for matching names, e.g., results to members
+#
+#   Date        Author      Reason
+#   ----        ------      ------
+#   10/18/26    Lou King    Create
+#
+#   Copyright 2026 Lou King
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+###########################################################################################
+'''
+namematch - blocking index for matching names
+===============================================================
+
+Comparing every incoming name against every known name is quadratic. A :class:`NameIndex`
+holds the known names (e.g., members) under blocking keys, so that each incoming name
+(e.g., a results row) need only be compared against a small set of candidates.
+
+Blocking key::
+
+    (last name, first name class, birth year bucket)
+
+* last name is the lname from :func:`namesplitter.split_full_name`, lower case with
+  everything but letters and digits removed
+* first name class is each of the :meth:`NameDenormalizer.classids` of the first word of
+  the first name, or the first name itself if it is not in the nickname table
+* birth year bucket is birth year // yearbucket, only if the index was created with yearbucket
+
+First names which are nicknames of each other share a class, so candidates include
+all known names with the same last name and an equivalent first name. When birth years are
+used, candidates are also limited to those within the same or adjacent buckets, or whose
+birth year is not known.
+'''
+
+# standard
+import re
+from collections import defaultdict
+
+# homegrown
+from .namesplitter import split_full_name
+from .nicknames import NameDenormalizer
+
+# characters removed from names for blocking
+NONALNUM = re.compile(r'[^a-z0-9]')
+
+class NameIndex(object):
+    '''
+    index of names, for finding match candidates
+
+    usage:
+        $ index = NameIndex(yearbucket=5)
+        $ for member in members:
+        $     index.add(member, member.name, member.birthyear)
+        $ for result in results:
+        $     for member in index.candidates(result.name, result.birthyear):
+        $         # compare result with member
+
+    :param nicknames: NameDenormalizer instance, default is created from packaged table
+    :param yearbucket: width of birth year buckets in years, or None to ignore birth years
+    '''
+    def __init__(self, nicknames=None, yearbucket=None):
+        self.nicknames = nicknames or NameDenormalizer()
+        self.yearbucket = yearbucket
+        self.items = []
+        # {(lname, classid): {bucket: [itemndx, ...], ...}, ...}
+        self.blocks = defaultdict(lambda: defaultdict(list))
+
+    def _namekeys(self, name):
+        '''
+        get (lname, classid) keys for name
+
+        :param name: full name
+        :rtype: list of (lname, classid)
+        '''
+        try:
+            names = split_full_name(name)
+        except IndexError:
+            # empty name, or name only has words in parentheses
+            return [('', '')]
+        lname = NONALNUM.sub('', names['lname'].lower())
+        fname = names['fname'].split(' ', 1)[0].lower()
+        bare = fname.replace('.', '')
+        classids = self.nicknames.classids(fname) or self.nicknames.classids(bare) or (bare,)
+        return [(lname, classid) for classid in classids]
+
+    def _bucket(self, birthyear):
+        '''
+        get birth year bucket
+
+        :param birthyear: birth year or None
+        :rtype: bucket or None
+        '''
+        if self.yearbucket is None or birthyear is None:
+            return None
+        return int(birthyear) // self.yearbucket
+
+    def blockingkeys(self, name, birthyear=None):
+        '''
+        get blocking keys for a name
+
+        :param name: full name
+        :param birthyear: birth year, if known
+        :rtype: list of (lname, classid, bucket)
+        '''
+        bucket = self._bucket(birthyear)
+        return [(lname, classid, bucket) for lname, classid in self._namekeys(name)]
+
+    def add(self, item, name, birthyear=None):
+        '''
+        add an item to the index
+
+        :param item: item returned by candidates(), e.g., member record
+        :param name: full name for item
+        :param birthyear: birth year for item, if known
+        '''
+        itemndx = len(self.items)
+        self.items.append(item)
+        for lname, classid, bucket in self.blockingkeys(name, birthyear):
+            self.blocks[lname, classid][bucket].append(itemndx)
+
+    def candidates(self, name, birthyear=None):
+        '''
+        get items which may match name
+
+        :param name: full name
+        :param birthyear: birth year, if known
+        :rtype: list of items, in the order they were added
+        '''
+        bucket = self._bucket(birthyear)
+        found = set()
+        for key in self._namekeys(name):
+            buckets = self.blocks.get(key)
+            if not buckets:
+                continue
+            if bucket is None:
+                for itemndxs in buckets.values():
+                    found.update(itemndxs)
+            else:
+                for nearby in (bucket - 1, bucket, bucket + 1, None):
+                    found.update(buckets.get(nearby, ()))
+        return [self.items[itemndx] for itemndx in sorted(found)]
+
+    def __len__(self):
+        return len(self.items)
+
+#----------------------------------------------------------------------
+def main():
+#----------------------------------------------------------------------
+    '''
+    benchmark NameIndex against pairwise comparison, using synthetic members and results
+    '''
+    # standard -- only needed for benchmark
+    import argparse
+    import random
+    import time
+
+    # homegrown
+    from . import version
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-v', '--version', action='version', version='{0} {1}'.format('loutilities', version.__version__))
+    parser.add_argument('-m', '--members', type=int, default=100000, help='number of synthetic members, default %(default)s')
+    parser.add_argument('-r', '--results', type=int, default=10000, help='number of synthetic results rows, default %(default)s')
+    parser.add_argument('-p', '--pairwise', type=int, default=50, help='number of results rows to compare pairwise, default %(default)s')
+    parser.add_argument('-y', '--yearbucket', type=int, default=5, help='birth year bucket width, 0 to ignore birth years, default %(default)s')
+    parser.add_argument('-s', '--seed', type=int, default=1, help='random seed, default %(default)s')
+    args = parser.parse_args()
+
+    rand = random.Random(args.seed)
+    nicknames = NameDenormalizer()
+    fnames = sorted(nicknames.lookup) + ['Zeb{}'.format(i) for i in range(200)]
+    syllables = 'an ber cas do el fitz gan har is jo kel lin mor nas ol pe quin ros sta tu vin wal yor zim'.split()
+    lnames = sorted({''.join(rand.choice(syllables) for _ in range(rand.randint(2, 3))) for _ in range(30000)})
+
+    members = []
+    for _ in range(args.members):
+        members.append((rand.choice(fnames).title() + ' ' + rand.choice(lnames).title(), rand.randint(1940, 2010)))
+
+    # half of the results rows are members, often going by a nickname
+    results = []
+    for _ in range(args.results):
+        if rand.random() < 0.5:
+            member = rand.choice(members)
+            fname, lname = member[0].split(' ', 1)
+            equivalent = nicknames.get(fname)
+            if equivalent and rand.random() < 0.5:
+                fname = rand.choice(sorted(equivalent)).title()
+            results.append((fname + ' ' + lname, member[1] + rand.randint(-1, 1), member))
+        else:
+            results.append((rand.choice(fnames).title() + ' ' + rand.choice(lnames).title(), rand.randint(1940, 2010), None))
+
+    def ismatch(result, member):
+        fname, lname = result[0].lower().split(' ', 1)
+        mfname, mlname = member[0].lower().split(' ', 1)
+        if lname != mlname or abs(result[1] - member[1]) > 1:
+            return False
+        return fname == mfname or mfname in (nicknames.get(fname) or ())
+
+    start = time.perf_counter()
+    index = NameIndex(nicknames, yearbucket=args.yearbucket or None)
+    for member in members:
+        index.add(member, member[0], member[1])
+    buildtime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    numcandidates = 0
+    found = 0
+    expected = 0
+    for result in results:
+        candidates = index.candidates(result[0], result[1])
+        numcandidates += len(candidates)
+        matches = [member for member in candidates if ismatch(result, member)]
+        if result[2] is not None:
+            expected += 1
+            found += result[2] in matches
+    matchtime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for result in results[:args.pairwise]:
+        matches = [member for member in members if ismatch(result, member)]
+    pairwisetime = (time.perf_counter() - start) / args.pairwise
+
+    print('members {}, results {}'.format(len(members), len(results)))
+    print('index build        {:.2f}s, {:.0f} members/s'.format(buildtime, len(members) / buildtime))
+    print('indexed matching   {:.2f}s, {:.0f} results/s, {:.1f} candidates/result, recall {}/{}'.format(
+        matchtime, len(results) / matchtime, numcandidates / len(results), found, expected))
+    print('pairwise matching  {:.0f} results/s ({} rows sampled)'.format(1 / pairwisetime, args.pairwise))
+
+# ###############################################################################
+# ###############################################################################
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 #       Date            Author          Reason
 #       ----            ------          ------
 #       03/02/14        Lou King        Create
+#       10/18/26        Lou King        memoize split_full_name, add split_full_names
 #
 #   Copyright 2014 Lou King
 #
@@ -37,6 +38,7 @@ see http:#www.w3.org/International/questions/qa-personal-names for more informat
 '''
 # standard
 import re
+from functools import lru_cache
 
 # homegrown
 
@@ -46,13 +48,38 @@ SALUTATIONS = 'mr master mister mrs miss ms dr rev fr'.split()  # NOT USED - see
 PREFIXES = 'de da la du di del dei pietro vda. dello della degli delle van vanden vere von der den heer ten ter vande vanden vander voor ver aan mc ben st. st'.split()
 SUFFIXES = 'I II III IV V Senior Junior Jr Sr PhD APR RPh PE MD MA DMD CME'.split()
 
+# classification tables, keyed by lower case word with periods removed (except PREFIXSET)
+SALUTATIONMAP = {'mr': 'Mr.', 'master': 'Mr.', 'mister': 'Mr.', 'mrs': 'Mrs.', 'miss': 'Ms.', 'ms': 'Ms.',
+                 'dr': 'Dr.', 'rev': 'Rev.', 'fr': 'Fr.'}
+SUFFIXMAP = {}
+for _suffix in SUFFIXES:
+    SUFFIXMAP.setdefault(_suffix.lower(), _suffix)
+PREFIXSET = frozenset(PREFIXES)
+
+# maximum number of distinct names remembered by split_full_name
+NAMECACHESIZE = 8192
+
+CAMELCASE = re.compile(r"([A-Z]*[a-z'][a-z']*[A-Z']|[a-z']*[A-Z'][A-Z']*[a-z'])[A-Za-z]*")
+
 # split full names into the following parts:
 # - prefix / salutation  (Mr., Mrs., etc)
 # - given name / first name
 # - middle initials
 # - surname / last name
 # - suffix (II, Phd, Jr, etc)
+#
+# results for the most recent NAMECACHESIZE names are remembered, and a new dict is
+# returned for each call so callers may update it
 def split_full_name(full_name):
+    return dict(_split_full_name(full_name))
+
+# split each of the full names in an iterable, returns list of name dicts
+def split_full_names(full_names):
+    return [dict(_split_full_name(full_name)) for full_name in full_names]
+
+# memoized split, returns tuple of (key, value) pairs
+@lru_cache(maxsize=NAMECACHESIZE)
+def _split_full_name(full_name):
     full_name = full_name.strip()
     # split into words
     unfiltered_name_parts = full_name.split(' ')
@@ -121,13 +148,13 @@ def split_full_name(full_name):
         fname = fix_case(name_parts[i])
 
     # return the various parts
-    name = {}
-    name['salutation'] = salutation
-    name['fname'] = fname.strip()
-    name['initials'] = initials.strip()
-    name['lname'] = lname.strip()
-    name['suffix'] = suffix
-    return name
+    return (
+        ('salutation', salutation),
+        ('fname', fname.strip()),
+        ('initials', initials.strip()),
+        ('lname', lname.strip()),
+        ('suffix', suffix),
+    )
 
 # detect and format standard salutations
 # I'm only considering english honorifics for now & not words like
@@ -135,35 +162,18 @@ def is_salutation(word):
     # ignore periods
     word = word.replace('.','').lower()
     # returns normalized values
-    if (word in ["mr","master","mister"]):
-        return "Mr."
-    elif (word == "mrs"):
-        return "Mrs."
-    elif (word in ["miss","ms"]):
-        return "Ms."
-    elif (word == "dr"):
-        return "Dr."
-    elif (word == "rev"):
-        return "Rev."
-    elif (word == "fr"):
-        return "Fr."
-    else:
-        return False
+    return SALUTATIONMAP.get(word, False)
 
 #  detect and format common suffixes
 def is_suffix(word):
     # ignore periods
     word = word.replace('.','')
-    # these are some common suffixes - what am I missing?
-    suffix_array = SUFFIXES
-    for suffix in suffix_array:
-        if (suffix.lower() == word.lower()):
-            return suffix
-    return False
+    # these are some common suffixes - what am I missing? see SUFFIXES
+    return SUFFIXMAP.get(word.lower(), False)
 
 # detect compound last names like "Von Fange"
 def is_compound_lname(word):
-    return word.lower() in PREFIXES
+    return word.lower() in PREFIXSET
 
 # single letter, possibly followed by a period
 def is_initial(word):
@@ -173,7 +183,7 @@ def is_initial(word):
 # returns False if the string is all one case
 def is_camel_case(word):
     #if (re.match(r"|[A-Z]+|s", word) and re.match(r"|[a-z]+|s", word)):
-    if (re.match(r"([A-Z]*[a-z'][a-z']*[A-Z']|[a-z']*[A-Z'][A-Z']*[a-z'])[A-Za-z]*", word)):
+    if (CAMELCASE.match(word)):
         return True
     return False
 
@@ -5,8 +5,14 @@ adapted from https://github.com/carltonnorthern/nickname-and-diminutive-names-lo
 '''
 import collections
 import csv
+import os
+import pickle
+import sys
 from os.path import join, dirname, abspath
 
+# bump when the cached table format changes
+CACHEVERSION = 2
+
 class NameDenormalizer(object):
     '''
     denormalize any name
@@ -14,27 +20,97 @@ class NameDenormalizer(object):
     usage:
         $ nn = NameDenormalizer()
         $ nn.get('jeff')
-        {'geoff', 'jefferson', 'jeffrey', 'jefferey', 'geoffrey', 'sonny'}
+        frozenset({'geoff', 'jefferson', 'jeffrey', 'jefferey', 'geoffrey', 'sonny'})
+
+    the equivalent names for each name are computed when the table is loaded, and the same
+    frozenset is returned for every lookup of a given name
+
+    if cachefile is given, the computed table is pickled to that file, and later instances
+    load it from there rather than parsing the csv file, as long as the csv file has not changed
+
+    each line of the csv file is a nickname class, numbered from 0; two names are equivalent
+    if they share a class, see classids()
+
+    :param filename: csv file, each line has names which are equivalent (default nicknames.csv in this package)
+    :param cachefile: optional file name for cached table
     '''
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, cachefile=None):
         filename = filename or join(dirname(abspath(__file__)), 'nicknames.csv')
-        lookup = collections.defaultdict(list)
+        stat = os.stat(filename)
+        key = (CACHEVERSION, abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+        tables = None
+        if cachefile:
+            tables = self._loadcache(cachefile, key)
+        if tables is None:
+            tables = self._readcsv(filename)
+            if cachefile:
+                self._savecache(cachefile, key, tables)
+        self.lookup, self.classes = tables
+
+    @staticmethod
+    def _readcsv(filename):
+        '''
+        parse csv file into dict of frozensets of equivalent names, and dict of class ids
+
+        :param filename: csv file name
+        :rtype: ({name: frozenset(equivalent names), ...}, {name: (classid, ...), ...})
+        '''
+        groups = collections.defaultdict(list)
+        classes = collections.defaultdict(list)
         with open(filename) as f:
             reader = csv.reader(f)
-            for line in reader:
-                matches = set(line)
+            for classid, line in enumerate(reader):
+                matches = frozenset(map(sys.intern, line))
                 for match in matches:
-                    lookup[match].append(matches)
-        self.lookup = lookup
+                    groups[match].append(matches)
+                    classes[match].append(classid)
+        lookup = {}
+        for name, matcheslist in groups.items():
+            lookup[name] = frozenset().union(*matcheslist) - {name}
+        return lookup, {name: tuple(classids) for name, classids in classes.items()}
+
+    @staticmethod
+    def _loadcache(cachefile, key):
+        '''
+        load table from cache file
+
+        :param cachefile: cache file name
+        :param key: key identifying the csv file the table must have been built from
+        :rtype: (lookup, classes) tuple, or None if cache file is missing, unreadable or stale
+        '''
+        try:
+            with open(cachefile, 'rb') as f:
+                cachedkey, tables = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return None
+        if cachedkey != key:
+            return None
+        # pickle preserves sharing of equal strings within the tables, so no need to intern again
+        return tables
+
+    @staticmethod
+    def _savecache(cachefile, key, tables):
+        '''
+        save table to cache file, replacing the file atomically; failure to write is ignored
+
+        :param cachefile: cache file name
+        :param key: key identifying the csv file the table was built from
+        :param tables: (lookup, classes) tuple
+        '''
+        tmpfile = '{}.{}.tmp'.format(cachefile, os.getpid())
+        try:
+            with open(tmpfile, 'wb') as f:
+                pickle.dump((key, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, cachefile)
+        except OSError:
+            try:
+                os.remove(tmpfile)
+            except OSError:
+                pass
 
     def __getitem__(self, name):
-        name = name.lower()
-        if name not in self.lookup:
-            raise KeyError(name)
-        names = set().union(*self.lookup[name])
-        if name in names:
-            names.remove(name)
-        return names
+        return self.lookup[name.lower()]
 
     def get(self, name, default=None):
         '''
@@ -42,9 +118,15 @@ class NameDenormalizer(object):
 
         :param name: name to get set for
         :param default: return this if none found (default None)
-        :return: set of names, or default
+        :return: frozenset of names, or default
         '''
-        try:
-            return self[name]
-        except KeyError:
-            return default
\ No newline at end of file
+        return self.lookup.get(name.lower(), default)
+
+    def classids(self, name):
+        '''
+        get the nickname classes which include the indicated name
+
+        :param name: name to get classes for
+        :return: tuple of class ids, empty if name is not in the table
+        '''
+        return self.classes.get(name.lower(), ())
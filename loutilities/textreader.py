@@ -29,6 +29,15 @@ textreader - read text out of various file types
 # standard
 import argparse
 import csv
+import io
+import gzip
+import bz2
+import lzma
+import zipfile
+import queue
+import threading
+from itertools import islice
+from operator import itemgetter
 
 # pypi
 from charset_normalizer import detect
@@ -42,10 +51,27 @@ from . import version
 VALIDFTYPES = ['xls','xlsx','docx','txt','csv']
 # valid list types
 VALIDLTYPES = ['txt','csv']
+# compressed files are decompressed as they're read, file type is determined by the inner extension
+COMPRESSEDFTYPES = {
+    'gz': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+    'zip': None,    # member of zip archive, see _openbinary()
+}
 
 DOCXTABSIZE = 8
 TXTABSIZE = 8
 
+# csv encoding detection looks at a sample from the start of the file, growing the sample
+# when detection confidence is low
+ENCODINGSAMPLESIZE = 64*1024
+ENCODINGMAXSAMPLESIZE = 4*1024*1024
+ENCODINGMINCONFIDENCE = 0.9
+
+# PrefetchReader passes rows from its worker thread in batches
+PREFETCHBATCHSIZE = 64
+PREFETCHQUEUESIZE = 16
+
 # exceptions for this module.  See __init__.py for package exceptions
 class headerError(Exception): pass
 class parameterError(Exception): pass
@@ -60,12 +86,15 @@ class TextDictReader():
     :param fieldxform: {'fieldname1':['hdr11, hdr12, ...'], 'fieldname2':[hdr21, ...], ...}, where fieldnamex will be returned in dict, hdrxx are possible headers for columns
     :param reqdfields: list of fields required to be in the header
     :param filetype: if filename is list, this should be filetype list should be interpreted as
+    :param readonly: for xlsx files, stream rows using openpyxl read-only mode (see :class:`TextReader`)
+    :param encoding: for csv files, encoding to use instead of detecting it (see :class:`TextReader`)
+    :param member: for zip files, name of archive member to read (see :class:`TextReader`)
     '''
     #----------------------------------------------------------------------
-    def __init__(self, filename, fieldxform, reqdfields, filetype='extension'):
+    def __init__(self, filename, fieldxform, reqdfields, filetype='extension', readonly=True, encoding=None, member=None):
     #----------------------------------------------------------------------
         # open the textreader using the file
-        self.file = TextReader(filename, filetype)
+        self.file = TextReader(filename, filetype, readonly=readonly, encoding=encoding, member=member)
         self.fieldxform = fieldxform
         self.reqdfields = reqdfields
         
@@ -73,8 +102,27 @@ class TextDictReader():
         self.field = {}
 
         # scan to the header line
+        self._compilehdr()
         self._findhdr()
 
+    #----------------------------------------------------------------------
+    def _compilehdr(self):
+    #----------------------------------------------------------------------
+        '''
+        index the header match possibilities by their first word, so each word in a
+        candidate header line only needs to be checked against the matches which start with it
+
+        self._hdrcandidates is {'firstword': [(field, matchndx, [word, ...]), ...], ...}
+        '''
+        self._hdrcandidates = {}
+        for f in self.fieldxform:
+            for matchndx, m in enumerate(self.fieldxform[f]):
+                # m is either a string or a list of strings
+                if isinstance(m, str):
+                    m = [m]         # make single string into list
+                if not m: continue
+                self._hdrcandidates.setdefault(m[0], []).append((f, matchndx, list(m)))
+
     #----------------------------------------------------------------------
     def _findhdr(self):
     #----------------------------------------------------------------------
@@ -101,37 +149,28 @@ class TextDictReader():
                     for word in origline:
                         line.append(str(word).lower())  # str() called in case non-string returned in origline
                     
-                # loop for each potential self.field in a header
-                for fieldndx in range(len(fields)):
-                    f = fields[fieldndx]
-                    match = self.fieldxform[f]
-                    
-                    # loop for each match possiblity, then within the fields in file header
-                    # folding loop likes this gives precedence to the list order of the match possibilities
-                    for m in match:
-                        # loop for each column in this line, trying to find match possiblities
-                        matchfound = False
-                        for linendx in range(len(line)):                        
-                            # match over the end of the line is no match
-                            # m is either a string or a list of strings
-                            if isinstance(m, str):
-                                m = [m]         # make single string into list
-                            if linendx+len(m)>len(line):
-                                continue
-                            # if we found the match, remember start and end of match
-                            if line[linendx:linendx+len(m)] == m:
-                                if f not in self.field: self.field[f] = {}
-                                self.field[f]['start'] = linendx
-                                self.field[f]['end'] = linendx + len(m)
-                                self.field[f]['match'] = m
-                                self.field[f]['genfield'] = f   # seems redundant, but [f] index is lost later in self.foundfields
-                                fieldsfound += 1
-                                matchfound = True
-                                break   # match possibility loop
-                        
-                        # found match for this self.field
-                        if matchfound: break
-                
+                # look up match possibilities by the first word of each, trying each column in this line
+                # for each field, the earliest match possibility in the list order takes precedence, then the
+                # earliest column in the line
+                linematches = {}
+                for linendx, word in enumerate(line):
+                    for f, matchndx, m in self._hdrcandidates.get(word, ()):
+                        # match over the end of the line is no match (slice is short)
+                        if line[linendx:linendx+len(m)] == m:
+                            if f not in linematches or matchndx < linematches[f][0]:
+                                linematches[f] = (matchndx, linendx, m)
+
+                # remember start and end of match for each field found
+                for f in fields:
+                    if f not in linematches: continue
+                    matchndx, linendx, m = linematches[f]
+                    if f not in self.field: self.field[f] = {}
+                    self.field[f]['start'] = linendx
+                    self.field[f]['end'] = linendx + len(m)
+                    self.field[f]['match'] = m
+                    self.field[f]['genfield'] = f   # seems redundant, but [f] index is lost later in self.foundfields
+                    fieldsfound += 1
+
                 # here we've gone through each self.field in the line
                 # need to match more than MINMATCHES to call it a header line
                 if fieldsfound >= MINMATCHES:
@@ -205,6 +244,16 @@ class TextDictReader():
                 currcol = f['start'] - skipped
                 self.fieldcols.append(currcol)
                 skipped += len(f['match']) - 1  # if matched multiple columns, need to skip some
+
+            # projection of the data columns associated with the generic headers, in header order
+            self._maxcol = max(self.fieldcols, default=-1)
+            if len(self.fieldcols) == 0:
+                self._project = lambda row: ()
+            elif len(self.fieldcols) == 1:
+                col = self.fieldcols[0]
+                self._project = lambda row: (row[col],)
+            else:
+                self._project = itemgetter(*self.fieldcols)
                 
         # not good to come here
         except StopIteration:
@@ -221,14 +270,74 @@ class TextDictReader():
         rawline = next(self.file)
         
         # pick columns which are associated with generic headers
-        filteredline = [rawline[i] for i in range(len(rawline)) if i in self.fieldcols]
+        if len(rawline) > self._maxcol:
+            filteredline = self._project(rawline)
+        # short line, only pick the columns which are present
+        else:
+            filteredline = [rawline[i] for i in self.fieldcols if i < len(rawline)]
         
         # create dict association, similar to csv.DictReader
-        result = dict(list(zip(self.fieldhdrs,filteredline)))
+        result = dict(zip(self.fieldhdrs,filteredline))
                    
         # and return result
         return result
 
+    #----------------------------------------------------------------------
+    def __iter__(self):
+    #----------------------------------------------------------------------
+        return self
+
+    #----------------------------------------------------------------------
+    def close(self):
+    #----------------------------------------------------------------------
+        '''
+        close the underlying TextReader file
+        '''
+        self.file.close()
+
+    #----------------------------------------------------------------------
+    def read_chunks(self, size, asarray=False, dtypes=None):
+    #----------------------------------------------------------------------
+        '''
+        generator which returns the remaining data from the file in column oriented blocks,
+        each containing up to size rows
+
+        columns missing from short rows are filled with None so all columns in a block have the same length
+
+        :param size: maximum number of rows in each block
+        :param asarray: if True, each column is returned as a numpy array rather than a list
+        :param dtypes: if asarray, optional {'fieldname':dtype, ...} for array conversion, otherwise numpy infers the dtype
+        :rtype: yields {'fieldname1':[value, ...], 'fieldname2':[value, ...], ...}
+        '''
+        if size < 1:
+            raise parameterError('size must be positive, got {}'.format(size))
+
+        if asarray:
+            import numpy
+            if dtypes is None:
+                dtypes = {}
+
+        fieldcols = self.fieldcols
+        while True:
+            rows = []
+            for rawline in islice(self.file, size):
+                if len(rawline) > self._maxcol:
+                    rows.append(self._project(rawline))
+                else:
+                    rows.append([rawline[i] if i < len(rawline) else None for i in fieldcols])
+
+            if not rows:
+                return
+
+            # transpose the rows into columns
+            columns = list(zip(*rows)) if fieldcols else []
+            if asarray:
+                block = {f: numpy.array(c, dtype=dtypes.get(f)) for f, c in zip(self.fieldhdrs, columns)}
+            else:
+                block = {f: list(c) for f, c in zip(self.fieldhdrs, columns)}
+
+            yield block
+
 ########################################################################
 class TextReader():
 ########################################################################
@@ -240,18 +349,29 @@ class TextReader():
     '''
 
     #----------------------------------------------------------------------
-    def __init__(self, filename, filetype='extension'):
+    def __init__(self, filename, filetype='extension', readonly=True, encoding=None, member=None):
     #----------------------------------------------------------------------
         """
         open TextReader file
+
+        filename may be compressed, e.g., results.csv.gz, results.txt.bz2, results.xlsx.xz, or results.zip.
+        The file is decompressed as it is read, and its type is determined from the inner extension
+        (or the zip member's extension). Since xls, xlsx and docx files require random access, compressed
+        files of these types are decompressed into memory.
         
         :param filename: name of file to open, or list-like
         :param filetype: if filename is list, this should be filetype list should be interpreted as
+        :param readonly: for xlsx files, if True (default) rows are streamed from the file using openpyxl
+            read-only mode, so only the current row is held in memory. If False, the full workbook is loaded.
+        :param encoding: for csv files, encoding of the file. If None (default) the encoding is detected
+            from a sample at the start of the file, see :func:`detectencoding`
+        :param member: for zip files, name of archive member to read. If None (default) the first member
+            with a valid extension is read
         """
 
         # if true filename, type of filename is string
         if isinstance(filename, str):
-            self.ftype = filename.split('.')[-1].lower() # get extension
+            self.ftype, self.compression, self.member = _filetypes(filename, member)
             self.intype = 'file'
             if self.ftype not in VALIDFTYPES:
                 raise parameterError('Invalid filename {}: must have extension in {}'.format(filename, VALIDFTYPES))
@@ -259,13 +379,24 @@ class TextReader():
         else:
             self.ftype = filetype.lower()
             self.intype = 'list'
+            self.compression = None
             if self.ftype not in VALIDLTYPES:
                 raise parameterError('Invalid list: must use filetype in {}'.format(VALIDLTYPES))
+
+        # these file types need random access, so compressed files are decompressed into memory
+        if self.compression and self.ftype in ['xls', 'xlsx', 'docx']:
+            with _openbinary(filename, self.compression, self.member) as binaryfile:
+                source = io.BytesIO(binaryfile.read())
+        else:
+            source = filename
         
         # handle excel files
         if self.ftype in ['xls']:
             from xlrd import open_workbook
-            self.workbook = open_workbook(filename)
+            if self.compression:
+                self.workbook = open_workbook(file_contents=source.getvalue())
+            else:
+                self.workbook = open_workbook(filename)
             self.sheet = self.workbook.sheet_by_index(0)    # only first sheet is considered
             self.currrow = 0
             self.nrows = self.sheet.nrows
@@ -275,23 +406,32 @@ class TextReader():
         # handle excel files
         elif self.ftype in ['xlsx']:
             from openpyxl import load_workbook
-            self.workbook = load_workbook(filename)
+            self.readonly = readonly
+            self.workbook = load_workbook(source, read_only=readonly)
             self.sheet = self.workbook[self.workbook.sheetnames[0]]    # only first sheet is considered
+            # rows are padded to the sheet width, as in full mode
+            self.ncols = self.sheet.max_column or 0
+            if readonly:
+                # some writers save a stale <dimension>, which would truncate the rows read
+                # so the width also grows with the widest row seen
+                self.sheet.reset_dimensions()
             self.currrow = 0
-            self.rows = list(self.sheet.rows)
-            self.nrows = len(list(self.sheet.rows))
+            # rows are pulled lazily by __next__; in read-only mode they are parsed from the file as needed
+            self.rows = self.sheet.iter_rows(values_only=True)
             self.delimited = True               # rows are already broken into columns
 
         # handle word files
         elif self.ftype in ['docx']:
             import docx
-            doc = docx.opendocx(filename)
+            doc = docx.opendocx(source)
             self.lines = iter(docx.getdocumenttext(doc))
             self.delimited = False
             
         # handle txt files
         elif self.ftype in ['txt']:
-            if self.intype == 'file':
+            if self.intype == 'file' and self.compression:
+                self.TXT = io.TextIOWrapper(_openbinary(filename, self.compression, self.member))
+            elif self.intype == 'file':
                 self.TXT = open(filename,'r')
             else:
                 self.TXT = iter(filename)
@@ -300,10 +440,13 @@ class TextReader():
         # handle csv files
         elif self.ftype in ['csv']:
             if self.intype == 'file':
-                with open(filename, 'rb') as binaryfile:
-                    rawdata = binaryfile.read()
-                detected = detect(rawdata)
-                self._CSV = open(filename, 'r', encoding=detected['encoding'], newline='', errors='replace')
+                if not encoding:
+                    encoding = detectencoding(filename, member=self.member)
+                if self.compression:
+                    self._CSV = io.TextIOWrapper(_openbinary(filename, self.compression, self.member),
+                                                 encoding=encoding, newline='', errors='replace')
+                else:
+                    self._CSV = open(filename, 'r', encoding=encoding, newline='', errors='replace')
             else:
                 self._CSV = iter(filename)
             self.CSV = csv.reader(self._CSV)
@@ -312,6 +455,11 @@ class TextReader():
         self.delimiters = None
         self.opened = True
         
+    #----------------------------------------------------------------------
+    def __iter__(self):
+    #----------------------------------------------------------------------
+        return self
+
     #----------------------------------------------------------------------
     def __next__(self):
     #----------------------------------------------------------------------
@@ -337,11 +485,13 @@ class TextReader():
         
         # handle excel files
         if self.ftype in ['xlsx']:
-            if self.currrow >= self.nrows:
-                raise StopIteration
-            
-            row = [c.value for c in self.rows[self.currrow]]
+            row = list(next(self.rows))
             self.currrow += 1
+            # read-only rows stop at their last cell
+            if len(row) < self.ncols:
+                row += [None] * (self.ncols - len(row))
+            else:
+                self.ncols = len(row)
             return row
         
         # handle word files
@@ -383,8 +533,13 @@ class TextReader():
             pass    # no resources to release
 
         # handle excel files
-        elif self.ftype in ['xls','xlsx']:
+        elif self.ftype in ['xls']:
             pass    # resources have already been released
+
+        # read-only workbook keeps the file open until closed
+        elif self.ftype in ['xlsx']:
+            if self.readonly:
+                self.workbook.close()
         
         # handle word files
         elif self.ftype in ['docx']:
@@ -432,6 +587,15 @@ class TextReader():
             
         self.delimiters = delimiters
         self.delimited = True
+
+        # compile the delimiters into slices, so a line can be split with a single itemgetter call
+        # last slice goes to end of line
+        slices = [slice(start, end) for start, end in zip(delimiters, delimiters[1:] + [None])]
+        if len(slices) == 1:
+            thisslice = slices[0]
+            self._slicer = lambda s: (s[thisslice],)
+        elif slices:
+            self._slicer = itemgetter(*slices)
         
     #----------------------------------------------------------------------
     def delimit(self,s):
@@ -446,14 +610,209 @@ class TextReader():
         if not self.delimiters:
             raise parameterError('cannot split string if delimiters not set')
         
-        rval = []
-        for i in range(len(self.delimiters)):
-            start = self.delimiters[i]
-            end = self.delimiters[i+1] if i+1 < len(self.delimiters) else None   # last one goes to end of s
-            rval.append(s[start:end].strip())
-            
-        return rval
+        return list(map(str.strip, self._slicer(s)))
             
+########################################################################
+class PrefetchReader():
+########################################################################
+    '''
+    read ahead from a :class:`TextReader` or :class:`TextDictReader` in a background thread,
+    so parsing the file overlaps with the caller's processing of each row
+
+    rows are returned in file order. An exception raised by the underlying reader is raised
+    by __next__ after the rows read before it have been returned. close() stops the worker
+    thread and closes the underlying reader.
+
+    :param reader: TextReader or TextDictReader, already opened
+    :param batchsize: number of rows the worker thread passes at a time
+    :param queuesize: maximum number of batches read ahead
+    '''
+    _END = object()
+
+    #----------------------------------------------------------------------
+    def __init__(self, reader, batchsize=PREFETCHBATCHSIZE, queuesize=PREFETCHQUEUESIZE):
+    #----------------------------------------------------------------------
+        self.reader = reader
+        self.batchsize = batchsize
+        self.queue = queue.Queue(maxsize=queuesize)
+        self.stopping = threading.Event()
+        self.batch = iter([])
+        self.finished = False
+        self.error = None
+        self.opened = True
+
+        self.thread = threading.Thread(target=self._prefetch, name='PrefetchReader', daemon=True)
+        self.thread.start()
+
+    #----------------------------------------------------------------------
+    def _prefetch(self):
+    #----------------------------------------------------------------------
+        '''
+        worker thread, puts (rows, status) on the queue, where status is None if more rows follow,
+        self._END at end of file, or the exception raised by the reader
+        '''
+        while not self.stopping.is_set():
+            rows = []
+            status = None
+            try:
+                for i in range(self.batchsize):
+                    rows.append(next(self.reader))
+            except StopIteration:
+                status = self._END
+            except Exception as e:
+                status = e
+
+            # don't block forever if the consumer has closed
+            while not self.stopping.is_set():
+                try:
+                    self.queue.put((rows, status), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+            if status is not None:
+                return
+
+    #----------------------------------------------------------------------
+    def __iter__(self):
+    #----------------------------------------------------------------------
+        return self
+
+    #----------------------------------------------------------------------
+    def __next__(self):
+    #----------------------------------------------------------------------
+        '''
+        return the next row from the underlying reader
+        '''
+        if not self.opened:
+            raise ValueError('I/O operation on a closed file')
+
+        while True:
+            row = next(self.batch, self._END)
+            if row is not self._END:
+                return row
+
+            if self.finished:
+                if self.error is not None:
+                    error, self.error = self.error, None
+                    raise error
+                raise StopIteration
+
+            rows, status = self.queue.get()
+            self.batch = iter(rows)
+            if status is not None:
+                self.finished = True
+                if status is not self._END:
+                    self.error = status
+
+    #----------------------------------------------------------------------
+    def close(self):
+    #----------------------------------------------------------------------
+        '''
+        stop the worker thread and close the underlying reader
+        '''
+        if not self.opened:
+            return
+
+        self.opened = False
+        self.stopping.set()
+        self.thread.join()
+        self.reader.close()
+
+#----------------------------------------------------------------------
+def detectencoding(filename, samplesize=ENCODINGSAMPLESIZE, maxsamplesize=ENCODINGMAXSAMPLESIZE,
+                   minconfidence=ENCODINGMINCONFIDENCE, member=None):
+#----------------------------------------------------------------------
+    '''
+    detect the encoding of a file from a sample at the start of the file
+
+    the sample is doubled until detection confidence reaches minconfidence, the whole
+    file has been read, or the sample reaches maxsamplesize
+
+    :param filename: name of file to examine
+    :param samplesize: initial number of bytes to sample
+    :param maxsamplesize: maximum number of bytes to sample
+    :param minconfidence: detection confidence (0 to 1) considered good enough
+    :param member: if filename is a zip file, name of archive member to examine
+    :rtype: encoding name, or None if it could not be detected
+    '''
+    ftype, compression, member = _filetypes(filename, member)
+    with _openbinary(filename, compression, member) as binaryfile:
+        rawdata = b''
+        while True:
+            chunk = binaryfile.read(samplesize - len(rawdata))
+            rawdata += chunk
+            eof = len(rawdata) < samplesize
+
+            # don't let a multibyte character split at the end of the sample confuse detection
+            sample = rawdata
+            if not eof:
+                lastnewline = rawdata.rfind(b'\n')
+                if lastnewline > 0:
+                    sample = rawdata[:lastnewline+1]
+
+            detected = detect(sample)
+            if eof or samplesize >= maxsamplesize or (detected['confidence'] or 0) >= minconfidence:
+                # an all ascii sample says nothing about the rest of the file, and utf-8 is a superset
+                if detected['encoding'] == 'ascii':
+                    return 'utf-8'
+                return detected['encoding']
+
+            samplesize = min(2*samplesize, maxsamplesize)
+
+#----------------------------------------------------------------------
+def _filetypes(filename, member=None):
+#----------------------------------------------------------------------
+    '''
+    determine file type and compression for a file
+
+    :param filename: name of file
+    :param member: for zip files, name of archive member, or None to use the first member with a valid extension
+    :rtype: (ftype, compression, member), compression is None for uncompressed files
+    '''
+    parts = filename.split('.')
+    ext = parts[-1].lower()
+    if ext not in COMPRESSEDFTYPES:
+        return ext, None, None
+
+    if ext == 'zip':
+        with zipfile.ZipFile(filename) as archive:
+            if member is None:
+                for info in archive.infolist():
+                    if not info.is_dir() and info.filename.split('.')[-1].lower() in VALIDFTYPES:
+                        member = info.filename
+                        break
+                else:
+                    raise parameterError('{}: no member with extension in {}'.format(filename, VALIDFTYPES))
+            elif member not in archive.namelist():
+                raise parameterError('{}: member {} not found'.format(filename, member))
+        return member.split('.')[-1].lower(), ext, member
+
+    # compressed file, e.g., results.csv.gz
+    innerext = parts[-2].lower() if len(parts) > 2 else ''
+    return innerext, ext, None
+
+#----------------------------------------------------------------------
+def _openbinary(filename, compression, member=None):
+#----------------------------------------------------------------------
+    '''
+    open a possibly compressed file for binary reading, decompressing as it is read
+
+    :param filename: name of file
+    :param compression: key in COMPRESSEDFTYPES, or None if uncompressed
+    :param member: for zip files, name of archive member
+    :rtype: binary file object
+    '''
+    if compression is None:
+        return open(filename, 'rb')
+
+    if compression == 'zip':
+        # the archive's underlying file stays open until the member is closed
+        with zipfile.ZipFile(filename) as archive:
+            return archive.open(member)
+
+    return COMPRESSEDFTYPES[compression](filename, 'rb')
+
 ################################################################################
 def main():
 ################################################################################
@@ -2,8 +2,38 @@
 transform - transformation methods
 '''
 
+# standard
+from operator import attrgetter, itemgetter
+
 # homegrown
-from .csvu import str2num
+from .csvu import str2num, _str2int, _str2float, _str2str
+
+# strings which are converted to boolean
+BOOLSTRINGS = {'false': False, 'False': False, 'true': True, 'True': True}
+
+def _makeconverter():
+    '''
+    make function(value) to maybe convert string to number or boolean, for a single mapping key
+
+    the result is the same as str2num, but the conversion expected from the type of the previous
+    value is tried first, so values of a consistent type avoid failed conversion attempts
+
+    :rtype: function(value) which returns converted value
+    '''
+    convert = str2num
+    def converter(value):
+        nonlocal convert
+        if isinstance(value, str):
+            value = convert(value)
+            if isinstance(value, str):
+                convert = _str2str
+                value = BOOLSTRINGS.get(value, value)
+            elif isinstance(value, int):
+                convert = _str2int
+            else:
+                convert = _str2float
+        return value
+    return converter
 
 class Transform():
     '''
@@ -14,6 +44,9 @@ class Transform():
 
     source and target may be dict-like or class-like
 
+    the mapping is compiled when the object is created. If mapping, sourceattr or knownstrings
+    are changed afterwards, call compile()
+
     :param mapping: mapping dict with key for each target attr, value is key in source or function(source)
     :param sourceattr: True if getattr works with source, otherwise uses __getitem__ (as dict)
     :param targetattr: True if setattr works with target, otherwise uses __setitem__ (as dict)
@@ -25,42 +58,65 @@ class Transform():
         self.sourceattr = sourceattr
         self.targetattr = targetattr
         self.knownstrings = knownstrings
+        self.compile()
 
-    def transform(self, source, target):
+    def compile(self):
         '''
-        set target values based on source object
-
-        :param source: source object (dict-like or class-like)
-        :param target: target object (dict-like or class-like)
+        compile mapping into list of (key, getter, converter) for each target key, where getter is
+        function(source) and converter is function(value) or None if no conversion is done
         '''
-
-        # create target values based on mapping
+        self._plan = []
         for key in self.mapping:
             # call the function to fill target
             if hasattr(self.mapping[key], '__call__'):
-                callback = self.mapping[key]
-                value = callback(source)
-            
+                getter = self.mapping[key]
+
             # simple map from source field
             else:
                 sourceattr = self.mapping[key]
-                if self.sourceattr:
-                    value = getattr(source, sourceattr)
+                if not self.sourceattr:
+                    getter = itemgetter(sourceattr)
+                # attrgetter would treat dotted name as nested attributes
+                elif isinstance(sourceattr, str) and '.' not in sourceattr:
+                    getter = attrgetter(sourceattr)
                 else:
-                    value = source[sourceattr]
+                    getter = lambda source, sourceattr=sourceattr: getattr(source, sourceattr)
 
             # maybe convert to number or boolean before saving in target
             # skip keys which are known to be strings
-            if isinstance(value, str) and key not in self.knownstrings:
-                value = str2num(value)
-                if value in ['false', 'False']:
-                    value = False
-                elif value in ['true', 'True']:
-                    value = True
-
-            # save value in target
-            if self.targetattr:
-                setattr(target, key, value)
-            else:
-                target[key] = value
+            converter = None if key in self.knownstrings else _makeconverter()
+
+            self._plan.append((key, getter, converter))
+
+    def transform(self, source, target):
+        '''
+        set target values based on source object
 
+        :param source: source object (dict-like or class-like)
+        :param target: target object (dict-like or class-like)
+        '''
+
+        # create target values based on mapping, and save value in target
+        if self.targetattr:
+            for key, getter, converter in self._plan:
+                value = getter(source)
+                setattr(target, key, value if converter is None else converter(value))
+        else:
+            for key, getter, converter in self._plan:
+                value = getter(source)
+                target[key] = value if converter is None else converter(value)
+
+    def transform_many(self, sources, target_factory):
+        '''
+        create a target for each source
+
+        :param sources: iterable of source objects (dict-like or class-like)
+        :param target_factory: function() which returns a new target object, e.g., model class or dict
+        :rtype: list of target objects
+        '''
+        targets = []
+        for source in sources:
+            target = target_factory()
+            self.transform(source, target)
+            targets.append(target)
+        return targets
@@ -0,0 +1,355 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_anonymize_db - tests for loutilities.anonymize_db
+
+The regular expression tokenizer is checked against reference copies of the original
+character-by-character scanners, which define the expected behavior.
+'''
+# standard
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# homegrown
+from loutilities.anonymize_db import DumpAnonymizer, _split_insert_rows, _tokenize_row
+from loutilities import anonymize_db
+
+def ref_split_insert_rows(values_str):
+    rows = []
+    i = 0
+    n = len(values_str)
+    while i < n:
+        while i < n and values_str[i] != '(':
+            i += 1
+        if i >= n:
+            break
+        i += 1
+        start = i
+        depth = 1
+        while i < n and depth > 0:
+            c = values_str[i]
+            if c == "'":
+                i += 1
+                while i < n:
+                    if values_str[i] == '\\':
+                        i += 2
+                    elif values_str[i] == "'":
+                        i += 1
+                        break
+                    else:
+                        i += 1
+            elif c == '(':
+                depth += 1
+                i += 1
+            elif c == ')':
+                depth -= 1
+                if depth == 0:
+                    rows.append(values_str[start:i])
+                i += 1
+            else:
+                i += 1
+    return rows
+
+def ref_tokenize_row(s):
+    tokens = []
+    i = 0
+    n = len(s)
+    while i < n:
+        while i < n and s[i] in ' \t':
+            i += 1
+        if i >= n:
+            break
+        start = i
+        if s[i] == "'":
+            i += 1
+            while i < n:
+                if s[i] == '\\':
+                    i += 2
+                elif s[i] == "'":
+                    i += 1
+                    break
+                else:
+                    i += 1
+            token = s[start:i]
+        elif s[i:i+4] == 'NULL' and (i + 4 >= n or s[i + 4] in (',', ' ', '\t')):
+            token = 'NULL'
+            i += 4
+        elif s[i] == '0' and i + 1 < n and s[i + 1] in 'xX':
+            i += 2
+            while i < n and s[i] in '0123456789abcdefABCDEF':
+                i += 1
+            token = s[start:i]
+        else:
+            while i < n and s[i] not in (',', ' ', '\t'):
+                i += 1
+            token = s[start:i]
+        tokens.append(token)
+        while i < n and s[i] in ' \t':
+            i += 1
+        if i < n and s[i] == ',':
+            i += 1
+    return tokens
+
+CORPUS = [
+    '',
+    '()',
+    "(1,'a',NULL)",
+    "(1,'it\\'s (here), really',NULL),(2,'x\\\\',0x1F)",
+    "(1, 'a' , NULL ,\t-2.5e3 )",
+    "(1,,2,)",
+    "(NULLX,NULL,'NULL',0x,0X1g)",
+    "(1,(2,3),'a)')",
+    "(1,'unterminated",
+    "(1,'trailing backslash\\",
+    "(1,'a\nb','c\\\nd')",
+    "x(1) junk (2);",
+    "('a''b')",
+    "('é', 'ü\\'')",
+    "(1,2) , (3,4)",
+    "(1,2",
+    "  ,  ",
+]
+
+CONFIG = {
+    'tables': {
+        'user': {
+            'fields': {
+                'email': {'type': 'email'},
+                'name': {'type': 'fullname'},
+                'dob': {'type': 'date_shift'},
+            },
+        },
+        'localuser': {
+            'fields': {
+                'email': {'type': 'sync', 'source_table': 'user', 'join_field': 'user_id'},
+            },
+        },
+    },
+}
+
+DUMP = '''CREATE TABLE `user` (
+  `id` int NOT NULL,
+  `email` varchar(255) DEFAULT NULL,
+  `name` varchar(255) DEFAULT NULL,
+  `dob` date DEFAULT NULL,
+  `note` text,
+  PRIMARY KEY (`id`)
+);
+INSERT INTO `user` VALUES (1,'bob@x.com','Bob (Jr), Smith','1970-01-02','it\\'s, fine'),(2,'amy@x.com',NULL,NULL,NULL);
+INSERT INTO `user` (`id`,`email`) VALUES
+(3,'c@x.com'),
+(4,'d@x.com');
+INSERT INTO `other` VALUES (1,'keep@x.com');
+CREATE TABLE `localuser` (
+  `id` int NOT NULL,
+  `user_id` int DEFAULT NULL,
+  `email` varchar(255) DEFAULT NULL
+);
+INSERT INTO `localuser` VALUES (10,1,'bob@x.com'),(11,5,'zed@x.com');
+'''
+
+EXPECTED = '''CREATE TABLE `user` (
+  `id` int NOT NULL,
+  `email` varchar(255) DEFAULT NULL,
+  `name` varchar(255) DEFAULT NULL,
+  `dob` date DEFAULT NULL,
+  `note` text,
+  PRIMARY KEY (`id`)
+);
+INSERT INTO `user` VALUES
+(1,'user1@example.com','Firstname1 Lastname1','1971-02-06','it\\'s, fine'),
+(2,'user2@example.com',NULL,NULL,NULL);
+INSERT INTO `user` (`id`,`email`) VALUES
+(3,'user3@example.com'),
+(4,'user4@example.com');
+INSERT INTO `other` VALUES (1,'keep@x.com');
+CREATE TABLE `localuser` (
+  `id` int NOT NULL,
+  `user_id` int DEFAULT NULL,
+  `email` varchar(255) DEFAULT NULL
+);
+INSERT INTO `localuser` VALUES
+(10,1,'user1@example.com'),
+(11,5,'zed@x.com');
+'''
+
+class TokenizerTest(unittest.TestCase):
+
+    def test_corpus(self):
+        for s in CORPUS:
+            self.assertEqual(_split_insert_rows(s), ref_split_insert_rows(s), repr(s))
+            self.assertEqual(_tokenize_row(s), ref_tokenize_row(s), repr(s))
+            for row in ref_split_insert_rows(s):
+                self.assertEqual(_tokenize_row(row), ref_tokenize_row(row), repr(row))
+
+    def test_random(self):
+        rand = random.Random(1)
+        pieces = ["'", '\\', '(', ')', ',', ' ', '\t', '\n', 'NULL', 'NUL', '0x', '0X1f', 'a', '1', 'g', "'abc'", "'a\\'b'"]
+        for _ in range(20000):
+            s = ''.join(rand.choice(pieces) for _ in range(rand.randint(0, 20)))
+            self.assertEqual(_split_insert_rows(s), ref_split_insert_rows(s), repr(s))
+            self.assertEqual(_tokenize_row(s), ref_tokenize_row(s), repr(s))
+
+class DumpAnonymizerTest(unittest.TestCase):
+
+    def anonymize(self, dump, lazy=False):
+        out = io.StringIO()
+        DumpAnonymizer(CONFIG, lazy=lazy).process_file(io.StringIO(dump), out)
+        return out.getvalue()
+
+    def test_dump(self):
+        self.assertEqual(self.anonymize(DUMP), EXPECTED)
+
+    def test_plans(self):
+        config = {'tables': {'t': {'pk': 'key', 'fields': {
+            'a': {'type': 'fixed', 'value': 'F'},
+            'b': {'type': 'unknown'},
+            'c': {'type': 'ip'},
+        }}}}
+        dump = ("INSERT INTO `t` (`key`,`a`,`b`,`c`) VALUES ('k1',NULL,'x',NULL),('k2','y','z','1.2.3.4');\n"
+                "INSERT INTO `t` (`c`,`a`) VALUES ('5.6.7.8','w');\n")
+        anonymizer = DumpAnonymizer(config)
+        out = io.StringIO()
+        anonymizer.process_file(io.StringIO(dump), out)
+        self.assertEqual(out.getvalue(),
+                         "INSERT INTO `t` (`key`,`a`,`b`,`c`) VALUES\n('k1','F','x',NULL),\n('k2','F','z','127.0.0.1');\n"
+                         "INSERT INTO `t` (`c`,`a`) VALUES\n('127.0.0.1','F');\n")
+        # one plan per column list
+        self.assertEqual(len(anonymizer._plans), 2)
+        self.assertEqual(anonymizer._plans['t', ('c', 'a')].pk_idx, None)
+
+    def test_lazy(self):
+        self.assertEqual(self.anonymize(DUMP, lazy=True), EXPECTED)
+
+    def test_lazy_verbatim(self):
+        # columns past the last one needed are neither split nor counted, spacing is kept
+        dump = "INSERT INTO `user` (`id`, `email`, `x`) VALUES (1, 'a@x.com' ,'y', 'extra');\n"
+        self.assertEqual(self.anonymize(dump, lazy=True),
+                         "INSERT INTO `user` (`id`, `email`, `x`) VALUES\n(1, 'user1@example.com' ,'y', 'extra');\n")
+        self.assertEqual(self.anonymize(dump),
+                         "INSERT INTO `user` (`id`, `email`, `x`) VALUES\n(1, 'a@x.com' ,'y', 'extra');\n")
+
+        # too few columns is left unchanged
+        dump = "INSERT INTO `user` (`id`, `email`, `name`) VALUES (1, 'a@x.com');\n"
+        self.assertEqual(self.anonymize(dump, lazy=True),
+                         "INSERT INTO `user` (`id`, `email`, `name`) VALUES\n(1, 'a@x.com');\n")
+
+class StreamTest(unittest.TestCase):
+
+    def anonymize(self, dump):
+        out = io.StringIO()
+        DumpAnonymizer(CONFIG).process_file(io.StringIO(dump), out)
+        return out.getvalue()
+
+    @patch('loutilities.anonymize_db._STREAM_BATCH_SIZE', 1)
+    def test_rows_written_as_read(self):
+        header = DUMP.split('INSERT')[0]
+        lines = header.splitlines(True) + ['INSERT INTO `user` (`id`,`email`) VALUES\n'] + \
+                ["({},'e{}@x.com'){}\n".format(i, i, ';' if i == 99 else ',') for i in range(100)]
+        out = io.StringIO()
+
+        def infile():
+            for i, line in enumerate(lines):
+                # every row before this line has already been written
+                row = i - len(lines) + 100
+                if row > 0:
+                    self.assertIn("({},'user{}@example.com')".format(row - 1, row - 1), out.getvalue())
+                yield line
+
+        DumpAnonymizer(CONFIG).process_file(infile(), out)
+        self.assertTrue(out.getvalue().endswith("(99,'user99@example.com');\n"))
+
+    @patch('loutilities.anonymize_db._STREAM_BATCH_SIZE', 1)
+    def test_row_spans_lines(self):
+        dump = ("INSERT INTO `user` (`id`,`email`,`note`) VALUES (1,'a@x.com','one\ntwo (2)\n'),\n"
+                "(2,\n'b@x.com',\n'x');\n")
+        self.assertEqual(self.anonymize(dump),
+                         "INSERT INTO `user` (`id`,`email`,`note`) VALUES\n"
+                         "(1,'user1@example.com','one\ntwo (2)\n'),\n(2,'user2@example.com',\n'x');\n")
+
+    def test_header_spans_lines(self):
+        # buffered as a whole statement, as before
+        dump = "INSERT INTO `user` (`id`,\n`email`) VALUES\n(1,'a@x.com'),\n(2,'b@x.com');\n"
+        self.assertEqual(self.anonymize(dump),
+                         "INSERT INTO `user` (`id`,\n`email`) VALUES\n(1,'user1@example.com'),\n(2,'user2@example.com');\n")
+
+    def test_large_row(self):
+        # row larger than a batch, spanning many lines, is not rescanned for every line
+        note = 'x' * 99 + '\n'
+        nlines = 2 * anonymize_db._STREAM_BATCH_SIZE // len(note)
+        dump = ("INSERT INTO `user` (`id`,`email`,`note`) VALUES\n(1,'a@x.com','" + note * nlines + "'),\n"
+                "(2,'b@x.com','y');\n")
+        with patch('loutilities.anonymize_db._split_complete_rows',
+                   wraps=anonymize_db._split_complete_rows) as split:
+            out = self.anonymize(dump)
+        self.assertLess(split.call_count, 10)
+        self.assertEqual(out, "INSERT INTO `user` (`id`,`email`,`note`) VALUES\n(1,'user1@example.com','" +
+                         note * nlines + "'),\n(2,'user2@example.com','y');\n")
+
+    def test_truncated(self):
+        # complete rows are kept, the cut off row is dropped
+        dump = "INSERT INTO `user` (`id`,`email`) VALUES\n(1,'a@x.com'),\n(2,'b@x"
+        self.assertEqual(self.anonymize(dump), "INSERT INTO `user` (`id`,`email`) VALUES\n(1,'user1@example.com')\n")
+
+class ParallelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def writefile(self, name, text, newline=None):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(text)
+        return path
+
+    def serial(self, path):
+        out = io.StringIO()
+        with open(path, 'r', encoding='utf-8', errors='replace') as inf:
+            DumpAnonymizer(CONFIG).process_file(inf, out)
+        return out.getvalue()
+
+    def parallel(self, path, segment_size):
+        out = io.StringIO()
+        DumpAnonymizer(CONFIG).process_file_parallel(path, out, 2, segment_size=segment_size)
+        return out.getvalue()
+
+    def test_same_as_serial(self):
+        # localuser before user, so sync finds nothing, and another localuser after it
+        dump = DUMP.split('INSERT INTO `other`')[1].split('\n', 1)[1] + DUMP + \
+               "INSERT INTO `localuser` VALUES\n(12,2,'amy@x.com'),\n(13,1,'bob@x.com');\n"
+        path = self.writefile('dump.sql', dump)
+        for segment_size in (1, 100, 1 << 20):
+            self.assertEqual(self.parallel(path, segment_size), self.serial(path))
+
+    def test_crlf(self):
+        path = self.writefile('dump.sql', DUMP, newline='\r\n')
+        self.assertEqual(self.parallel(path, 1), EXPECTED)
+
+    def test_files(self):
+        # sync map carries over from first file to second
+        users, members = DUMP.split('CREATE TABLE `localuser`')
+        inpaths = [self.writefile('users.sql', users), self.writefile('members.sql', 'CREATE TABLE `localuser`' + members)]
+        outdir = os.path.join(self.tmpdir, 'out')
+        os.mkdir(outdir)
+        DumpAnonymizer(CONFIG).process_files([(p, os.path.join(outdir, os.path.basename(p))) for p in inpaths], jobs=2)
+        output = ''
+        for path in inpaths:
+            with open(os.path.join(outdir, os.path.basename(path)), encoding='utf-8') as f:
+                output += f.read()
+        self.assertEqual(output, EXPECTED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_boolexpr  -- test boolexpr
+=====================================================
+
+'''
+# standard
+import unittest
+
+# home grown
+from loutilities.boolexpr import BoolExpr, parseError, invalidParameter
+
+class BoolExprTest(unittest.TestCase):
+
+    def test_comparisons(self):
+        row = {'name': 'Alice', 'age': '34', 'time': '21:30', 'limit': '100'}
+        self.assertTrue(BoolExpr("name = 'Alice'")(row))
+        self.assertTrue(BoolExpr("name != 'Bob'")(row))
+        self.assertTrue(BoolExpr("age > 9")(row))           # numeric, not string, comparison
+        self.assertFalse(BoolExpr("age > '9'")(row))        # string comparison
+        self.assertTrue(BoolExpr("40 >= age")(row))
+        self.assertFalse(BoolExpr("time > 5")(row))         # not a number
+        self.assertTrue(BoolExpr("age < `limit`")(row))     # column to column, numeric
+        self.assertTrue(BoolExpr("name < time")(row) is False)
+
+    def test_in_between_matches(self):
+        row = {'name': 'McDonald', 'age': '45', 'city': 'Frederick'}
+        self.assertTrue(BoolExpr("city in ('Frederick', 'Walkersville')")(row))
+        self.assertTrue(BoolExpr("age IN (44, 45)")(row))
+        self.assertTrue(BoolExpr("city not in ('Boston')")(row))
+        self.assertTrue(BoolExpr("age between 40 and 49")(row))
+        self.assertFalse(BoolExpr("age not between 40 and 49")(row))
+        self.assertTrue(BoolExpr("name matches '^Mc'")(row))
+        self.assertFalse(BoolExpr("name matches '^mc'")(row))
+
+    def test_logic(self):
+        expr = BoolExpr("gender = 'F' and age between 40 and 49 and not (city in ('Frederick', 'Walkersville')) or name = 'Bob'")
+        self.assertTrue(expr({'gender': 'F', 'age': '45', 'city': 'Boston'}))
+        self.assertFalse(expr({'gender': 'F', 'age': '45', 'city': 'Frederick'}))
+        self.assertTrue(expr({'gender': 'M', 'name': 'Bob'}))
+        self.assertEqual(expr.columns(), ['gender', 'age', 'city', 'name'])
+
+    def test_long_term_lists(self):
+        # generated or/and lists must not nest a call per term
+        anyof = BoolExpr(' or '.join('a = {}'.format(i) for i in range(5000)))
+        self.assertTrue(anyof({'a': '3'}))
+        self.assertTrue(anyof({'a': '4999'}))
+        self.assertFalse(anyof({'a': '5000'}))
+        allof = BoolExpr(' and '.join('a != {}'.format(i) for i in range(5000)))
+        self.assertTrue(allof({'a': '5000'}))
+        self.assertFalse(allof({'a': '4999'}))
+
+    def test_null(self):
+        self.assertTrue(BoolExpr('city is null')({'city': ''}))
+        self.assertTrue(BoolExpr('city is null')({}))
+        self.assertTrue(BoolExpr('city is not null')({'city': 'Frederick'}))
+        self.assertFalse(BoolExpr("city = 'x'")({}))
+
+    def test_compile_list(self):
+        test = BoolExpr("`dist(km)` >= 5 and name matches 'a'").compile(['name', 'dist(km)'])
+        self.assertTrue(test(['Sam', '5.0']))
+        self.assertFalse(test(['Sam', '4.9']))
+        self.assertFalse(test(['Sam']))
+        with self.assertRaises(invalidParameter):
+            BoolExpr('age > 5').compile(['name'])
+
+    def test_parse_errors(self):
+        for expr in ['', 'a =', 'a in 3', '(a = 1', "a matches '('", "'a' matches 'b'", 'a = 1 b', 'a = $']:
+            with self.assertRaises(parseError, msg=expr):
+                BoolExpr(expr)
@@ -0,0 +1,44 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_csvu  -- test csvu
+=====================================================
+
+'''
+# standard
+import io
+import unittest
+
+# home grown
+from loutilities.csvu import DictReaderStr2Num, str2num, inferconverter
+
+CSVTEXT = (
+    'name,age,time,mixed\n'
+    'Alice,34,21.5,x\n'
+    'Bob,51,19.25,7\n'
+    'Carol,,20,3.5\n'
+    'Dan,n/a,1e2, y \n'
+    'Ed,40\n'
+)
+
+class DictReaderStr2NumTest(unittest.TestCase):
+
+    def test_infer_matches_str2num(self):
+        expected = list(DictReaderStr2Num(io.StringIO(CSVTEXT)))
+        for inferrows in [0, 1, 2, 10]:
+            rows = list(DictReaderStr2Num(io.StringIO(CSVTEXT), inferrows=inferrows))
+            self.assertEqual(rows, expected, 'inferrows={}'.format(inferrows))
+            self.assertEqual([type(r['time']) for r in rows], [type(r['time']) for r in expected])
+        self.assertEqual(expected[2], {'name': 'Carol', 'age': '', 'time': 20, 'mixed': 3.5})
+        self.assertEqual(expected[4], {'name': 'Ed', 'age': 40, 'time': None, 'mixed': None})
+
+    def test_inferconverter(self):
+        for values in [['1', '2', ''], ['1.5', '2'], ['a', '1'], []]:
+            converter = inferconverter(values)
+            for value in ['12', '1.5', '1e3', 'nan', 'abc', ' pad ', '', None, '1_000']:
+                self.assertEqual(repr(converter(value)), repr(str2num(value)))
@@ -0,0 +1,294 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_csvwt  -- test csvwt
+=====================================================
+
+'''
+# standard
+import io
+import os
+import re
+import csv
+import shutil
+import zipfile
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest.mock import patch
+
+# pypi
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# home grown
+from .models import Base, SeveralAttrs, NotUnique
+from loutilities.csvwt import Xls2Csv, Db2Csv, record2csv, mergedelta, invalidParameter, parameterError
+
+SHEETS = {
+    'Women': [['event', 'dist(km)', 'OC'], ['Mile', 1.609, 257], ['Marathon', 42.195, 8125]],
+    'Empty': [],
+    'Men': [['event', 'dist(km)', 'OC', 'extra'], ['Marathon', 42.195, 7235, 'x'], ['Mile', 1.609, 223, 'y']],
+}
+
+def readcsv(filename):
+    with open(filename, newline='') as f:
+        return list(csv.reader(f))
+
+def staledimension(filename):
+    '''rewrite xlsx file so its sheets claim a dimension of A1, as some third-party writers do'''
+    tmpname = filename + '.tmp'
+    with zipfile.ZipFile(filename) as inzip, zipfile.ZipFile(tmpname, 'w') as outzip:
+        for item in inzip.infolist():
+            data = inzip.read(item.filename)
+            if item.filename.startswith('xl/worksheets/'):
+                data = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', data)
+            outzip.writestr(item, data)
+    shutil.move(tmpname, filename)
+
+class Xls2CsvTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        wb = Workbook()
+        wb.remove(wb.active)
+        for name in SHEETS:
+            ws = wb.create_sheet(name)
+            for row in SHEETS[name]:
+                ws.append(row)
+        wb.save(self.filename)
+
+    # executed after each test
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def check(self, c):
+        files = c.getfiles()
+        self.assertEqual(list(files), ['Women', 'Men'])
+        for name in files:
+            self.assertEqual(readcsv(files[name]), [[str(v) for v in row] for row in SHEETS[name]])
+
+    def test_serial(self):
+        self.check(Xls2Csv(self.filename))
+
+    def test_parallel(self):
+        self.check(Xls2Csv(self.filename, workers=2))
+
+    def test_stale_dimension(self):
+        staledimension(self.filename)
+        self.check(Xls2Csv(self.filename))
+        self.check(Xls2Csv(self.filename, workers=2))
+
+    def test_hdrmap(self):
+        c = Xls2Csv(self.filename, hdrmap={'event': 'Event', 'OC': 'Standard'})
+        self.assertEqual(readcsv(c.getfiles()['Men']), [['Event', 'Standard'], ['Marathon', '7235'], ['Mile', '223']])
+
+class Db2CsvTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        engine = create_engine('sqlite://', echo=False)
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        for i in range(25):
+            self.session.add(SeveralAttrs(intAttr1=i, strAttr2='name {}'.format(i), strAttr3='town{}, MD'.format(i),
+                                          boolAttr4=i%2==0, dateAttr5=None))
+        self.session.commit()
+
+    # executed after each test
+    def tearDown(self):
+        self.session.close()
+
+    def test_stream_matches_orm(self):
+        hdrmap = {
+            'intAttr1': 'Number',
+            'strAttr2': {'First': lambda s, v: v.split(' ')[0], 'Last': lambda s, v: v.split(' ')[-1]},
+            'strAttr3': 'Town',
+            'dateAttr5': 'Date',
+        }
+        dd = Db2Csv()
+        dd.addtable('orm', self.session, SeveralAttrs, hdrmap, boolAttr4=True)
+        dd.addtable('stream', self.session, SeveralAttrs, hdrmap, yield_per=4, boolAttr4=True)
+        files = dd.getfiles()
+        orm = readcsv(files['orm'])
+        self.assertEqual(len(orm), 14)
+        self.assertEqual(orm[0], ['Number', 'First', 'Last', 'Town', 'Date'])
+        self.assertEqual(orm[1], ['0', 'name', '0', 'town0, MD', ''])
+        self.assertEqual(readcsv(files['stream']), orm)
+
+    def test_stream_no_hdrmap(self):
+        dd = Db2Csv()
+        dd.addtable('orm', self.session, SeveralAttrs)
+        dd.addtable('stream', self.session, SeveralAttrs, yield_per=10)
+        files = dd.getfiles()
+        self.assertEqual(readcsv(files['stream']), readcsv(files['orm']))
+
+class Db2CsvAddTablesTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        # file based database so each worker gets its own connection
+        fd, self.dbfile = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine('sqlite:///{}'.format(self.dbfile), echo=False)
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        for i in range(30):
+            self.session.add(NotUnique(value='value{}'.format(i%3)))
+            self.session.add(SeveralAttrs(intAttr1=i, strAttr2='name {}'.format(i)))
+        self.session.commit()
+
+    # executed after each test
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        os.unlink(self.dbfile)
+
+    def test_addtables(self):
+        dd = Db2Csv()
+        dd.addtables([
+            {'name': 'attrs', 'model': SeveralAttrs, 'hdrmap': {'intAttr1': 'Number', 'strAttr2': 'Name'}},
+            {'name': 'notunique', 'model': NotUnique, 'filters': {'value': 'value1'}},
+            {'name': 'attrs_streamed', 'model': SeveralAttrs},
+        ], self.session, workers=3, yield_per=7)
+        files = dd.getfiles()
+        self.assertEqual(list(files), ['attrs', 'notunique', 'attrs_streamed'])
+        attrs = readcsv(files['attrs'])
+        self.assertEqual(attrs[0], ['Number', 'Name'])
+        self.assertEqual(len(attrs), 31)
+        self.assertEqual(readcsv(files['notunique'])[1:], [[str(i), 'value1'] for i in range(2, 31, 3)])
+        self.assertEqual(len(readcsv(files['attrs_streamed'])), 31)
+
+class Record2CsvTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recs = [{'name': 'Alice', 'age': 34}, {'name': 'Bob, Jr.'}]
+        self.mapping = OrderedDict([('Name', 'name'), ('Age', 'age'), ('Initial', lambda r: r.name[0])])
+        self.expected = ['Name,Age,Initial\r\n', 'Alice,34,A\r\n', '"Bob, Jr.",,B\r\n']
+
+    def test_list(self):
+        self.assertEqual(record2csv(self.recs, self.mapping), self.expected)
+
+    def test_streaming(self):
+        out = io.StringIO(newline='')
+        self.assertIsNone(record2csv((r for r in self.recs), self.mapping, out, streaming=True))
+        self.assertEqual(out.getvalue(), ''.join(self.expected))
+
+    def test_streaming_file(self):
+        fd, filename = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        try:
+            record2csv(iter(self.recs), ['name', 'age'], filename, streaming=True)
+            self.assertEqual(readcsv(filename), [['name', 'age'], ['Alice', '34'], ['Bob, Jr.', '']])
+        finally:
+            os.unlink(filename)
+
+    def test_invalid_mapping(self):
+        with self.assertRaises(invalidParameter):
+            record2csv(self.recs, ('name', 'age'))
+        with self.assertRaises(invalidParameter):
+            record2csv(self.recs, {'Name': 1})
+
+class Db2CsvDeltaTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        engine = create_engine('sqlite://', echo=False)
+        Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        for i in range(10):
+            self.session.add(SeveralAttrs(intAttr1=1, strAttr2='name {}'.format(i)))
+        self.session.commit()
+        self.outdir = tempfile.mkdtemp()
+
+    # executed after each test
+    def tearDown(self):
+        self.session.close()
+        for name in os.listdir(self.outdir):
+            os.unlink(os.path.join(self.outdir, name))
+        os.rmdir(self.outdir)
+
+    def export(self):
+        dd = Db2Csv(outdir=self.outdir)
+        dd.addtabledelta('attrs', self.session, SeveralAttrs, {'id': 'id', 'strAttr2': 'name', 'intAttr1': 'version'},
+                         watermark='intAttr1', yield_per=3)
+        files = dd.getfiles()
+        return readcsv(files['attrs']), readcsv(files['attrs.deleted']), files
+
+    def test_delta(self):
+        # first export has everything
+        changed, deleted, files = self.export()
+        self.assertEqual(len(changed), 11)
+        self.assertEqual(deleted, [['id']])
+        snapshot = os.path.join(self.outdir, 'snapshot.csv')
+        os.replace(files['attrs'], snapshot)
+
+        # nothing changed, table isn't queried again
+        with patch.object(Db2Csv, '_streamtable') as streamtable:
+            changed, deleted, files = self.export()
+        streamtable.assert_not_called()
+        self.assertEqual(changed, [['id', 'name', 'version']])
+        self.assertEqual(deleted, [['id']])
+
+        # update, delete, insert
+        row = self.session.get(SeveralAttrs, 3)
+        row.strAttr2 = 'renamed'
+        row.intAttr1 = 2
+        self.session.delete(self.session.get(SeveralAttrs, 5))
+        self.session.add(SeveralAttrs(intAttr1=1, strAttr2='new'))
+        self.session.commit()
+
+        changed, deleted, files = self.export()
+        self.assertEqual(sorted(changed[1:]), [['11', 'new', '1'], ['3', 'renamed', '2']])
+        self.assertEqual(deleted, [['id'], ['5']])
+
+        mergedelta(snapshot, files['attrs'], files['attrs.deleted'], snapshot, ['id'])
+        merged = readcsv(snapshot)
+        self.assertEqual(len(merged), 11)
+        self.assertIn(['3', 'renamed', '2'], merged)
+        self.assertNotIn('5', [r[0] for r in merged])
+
+    def test_null_watermark(self):
+        # rows without a watermark are exported along with those with one
+        self.session.get(SeveralAttrs, 1).intAttr1 = None
+        self.session.get(SeveralAttrs, 2).intAttr1 = 5
+        self.session.commit()
+        changed, deleted, files = self.export()
+        self.assertEqual(len(changed), 11)
+        self.assertIn(['1', 'name 0', ''], changed)
+
+        # nothing changed
+        changed, deleted, files = self.export()
+        self.assertEqual(changed, [['id', 'name', 'version']])
+
+        # row gets a watermark, another loses its watermark
+        self.session.get(SeveralAttrs, 1).intAttr1 = 7
+        self.session.get(SeveralAttrs, 4).intAttr1 = None
+        self.session.commit()
+        changed, deleted, files = self.export()
+        self.assertEqual(sorted(changed[1:]), [['1', 'name 0', '7'], ['4', 'name 3', '']])
+
+        # only a row without a watermark changed, so only those rows are queried
+        self.session.get(SeveralAttrs, 4).strAttr2 = 'renamed'
+        self.session.get(SeveralAttrs, 4).intAttr1 = 8
+        self.session.commit()
+        self.export()
+        self.session.get(SeveralAttrs, 4).intAttr1 = None
+        self.session.commit()
+        with patch.object(Db2Csv, '_streamtable', autospec=True, side_effect=Db2Csv._streamtable) as streamtable:
+            changed, deleted, files = self.export()
+        criteria = streamtable.call_args.kwargs['criteria']
+        self.assertEqual([str(c) for c in criteria], [str(SeveralAttrs.intAttr1.is_(None))])
+        self.assertEqual(changed[1:], [['4', 'renamed', '']])
+
+    def test_outdir_required(self):
+        with self.assertRaises(parameterError):
+            Db2Csv().addtabledelta('attrs', self.session, SeveralAttrs, watermark='intAttr1')
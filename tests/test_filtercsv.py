@@ -0,0 +1,124 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_filtercsv  -- test filtercsv
+=====================================================
+
+'''
+# standard
+import io
+import os
+import csv
+import tempfile
+import unittest
+
+# home grown
+from loutilities.filtercsv import filtercsv, filtercsvparallel, compilefilter, invalidParameter, _rowranges
+
+INCSV = (
+    'name,city,gender\r\n'
+    'Alice,Frederick,F\r\n'
+    'Bob,"Walkersville, MD",M\r\n'
+    'Carol,Frederick\r\n'
+    'Dan,Frederick,M\r\n'
+)
+
+def runfilter(filt, incsv=INCSV):
+    out = io.StringIO(newline='')
+    filtercsv(filt, io.StringIO(incsv, newline=''), out)
+    return out.getvalue()
+
+class FilterCsvTest(unittest.TestCase):
+
+    def test_and(self):
+        self.assertEqual(runfilter('{"city":"Frederick","gender":"M"}'),
+                         'name,city,gender\r\nDan,Frederick,M\r\n')
+
+    def test_or(self):
+        self.assertEqual(runfilter([{'name': 'Bob'}, {'name': 'Alice'}, {'city': 'Frederick', 'gender': 'M'}]),
+                         'name,city,gender\r\nAlice,Frederick,F\r\nBob,"Walkersville, MD",M\r\nDan,Frederick,M\r\n')
+
+    def test_short_row(self):
+        # missing values compare as None, output is padded to header length
+        self.assertEqual(runfilter({'gender': None}), 'name,city,gender\r\nCarol,Frederick,\r\n')
+
+    def test_empty_dict(self):
+        self.assertEqual(runfilter([{'name': 'nobody'}, {}]).count('\r\n'), 5)
+
+    def test_empty_list(self):
+        self.assertEqual(runfilter('[]'), 'name,city,gender\r\n')
+        self.assertEqual(runfilter([], 'name,city,gender\r\n'), 'name,city,gender\r\n')
+
+    def test_blank_lines(self):
+        # blank lines are skipped, as csv.DictReader does, including the trailing one
+        incsv = 'name,city,gender\r\n\r\nAlice,Frederick,F\r\n\r\nCarol,Frederick\r\n\r\n'
+        for filt in [{}, {'gender': None}, 'gender is null']:
+            self.assertNotIn(',,', runfilter(filt, incsv))
+        self.assertEqual(runfilter({}, incsv), 'name,city,gender\r\nAlice,Frederick,F\r\nCarol,Frederick,\r\n')
+
+    def test_unknown_column(self):
+        with self.assertRaises(invalidParameter):
+            compilefilter({'age': '34'}, ['name', 'city'])
+
+    def test_not_dict(self):
+        with self.assertRaises(invalidParameter):
+            compilefilter('["name"]', ['name', 'city'])
+
+    def test_boolexpr(self):
+        self.assertEqual(runfilter("city matches 'MD' or (gender != 'M' and gender is not null)"),
+                         'name,city,gender\r\nAlice,Frederick,F\r\nBob,"Walkersville, MD",M\r\n')
+
+    def test_boolexpr_unknown_column(self):
+        with self.assertRaises(invalidParameter):
+            compilefilter("age > 5", ['name', 'city'])
+
+class FilterCsvParallelTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        with open(self.filename, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            writer.writerow(['name', 'note', 'gender'])
+            for i in range(500):
+                # quoted newlines and quotes must not be taken as row boundaries
+                note = 'line one\nline "two"\n' if i % 7 == 0 else 'Zoë, {}'.format(i)
+                writer.writerow(['runner{}'.format(i), note, 'FM'[i % 2]])
+
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def serial(self, filt):
+        out = io.StringIO(newline='')
+        with open(self.filename, newline='', encoding='utf-8') as IN:
+            filtercsv(filt, IN, out)
+        return out.getvalue()
+
+    def test_rowranges(self):
+        with open(self.filename, 'rb') as IN:
+            data = IN.read()
+        ranges = _rowranges(self.filename, 200, blocksize=64)
+        self.assertEqual(ranges[0], (0, len(b'name,note,gender\r\n')))
+        self.assertEqual(b''.join(data[start:end] for start, end in ranges), data)
+        rows = []
+        for start, end in ranges:
+            rows += list(csv.reader(io.StringIO(data[start:end].decode('utf-8'), newline='')))
+        self.assertEqual(len(rows), 501)
+
+    def test_parallel_matches_serial(self):
+        for filt in ['{"gender":"F"}', "note matches 'two' or name in ('runner3', 'runner499')"]:
+            out = io.StringIO(newline='')
+            filtercsvparallel(filt, self.filename, out, 3, chunksize=1000)
+            self.assertEqual(out.getvalue(), self.serial(filt))
+
+    def test_parallel_blank_lines(self):
+        with open(self.filename, 'a', newline='', encoding='utf-8') as out:
+            out.write('\r\nrunner500,,\r\n\r\n')
+        out = io.StringIO(newline='')
+        filtercsvparallel('gender is null', self.filename, out, 3, chunksize=1000)
+        self.assertEqual(out.getvalue(), 'name,note,gender\r\nrunner500,,\r\n')
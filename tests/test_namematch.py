@@ -0,0 +1,72 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_namematch - tests for loutilities.namematch
+'''
+# standard
+import os
+import shutil
+import tempfile
+import unittest
+
+# homegrown
+from loutilities.namematch import NameIndex
+from loutilities.nicknames import NameDenormalizer
+
+MEMBERS = [
+    ('Jeffrey Smith', 1970),
+    ('Geoff Smith', 1990),
+    ('Jefferson Smith', 1971),
+    ('Robert Van Der Berg', 1980),
+    ('Zebulon Smith', None),
+    ('Jeff Jones', 1970),
+]
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        csvfile = os.path.join(self.tmpdir, 'names.csv')
+        with open(csvfile, 'w') as f:
+            f.write('jeff,jeffrey,geoff\njeffrey,jefferson\nbob,robert\nk.c.,casey\n')
+        self.nicknames = NameDenormalizer(csvfile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def makeindex(self, yearbucket=None):
+        index = NameIndex(self.nicknames, yearbucket=yearbucket)
+        for name, birthyear in MEMBERS:
+            index.add(name, name, birthyear)
+        return index
+
+    def test_nicknames(self):
+        index = self.makeindex()
+        self.assertEqual(len(index), len(MEMBERS))
+        self.assertEqual(index.candidates('jeff smith'), ['Jeffrey Smith', 'Geoff Smith'])
+        self.assertEqual(index.candidates('Mr. Jeffrey Smith Jr.'), ['Jeffrey Smith', 'Geoff Smith', 'Jefferson Smith'])
+        self.assertEqual(index.candidates('Bob van der berg'), ['Robert Van Der Berg'])
+        self.assertEqual(index.candidates('Zebulon Smith'), ['Zebulon Smith'])
+        self.assertEqual(index.candidates('Alice Smith'), [])
+        self.assertEqual(index.candidates(''), [])
+
+    def test_birthyear(self):
+        index = self.makeindex(yearbucket=5)
+        self.assertEqual(index.candidates('Jeff Smith', 1971), ['Jeffrey Smith'])
+        self.assertEqual(index.candidates('Jeff Smith'), ['Jeffrey Smith', 'Geoff Smith'])
+        # unknown birth year is always a candidate
+        self.assertEqual(index.candidates('Zebulon Smith', 1950), ['Zebulon Smith'])
+
+    def test_blockingkeys(self):
+        index = NameIndex(self.nicknames, yearbucket=10)
+        self.assertEqual(index.blockingkeys("Jeffrey O'Brien", 1975), [('obrien', 0, 197), ('obrien', 1, 197)])
+        self.assertEqual(index.blockingkeys('K.C. Jones'), [('jones', 3, None)])
+        self.assertEqual(index.blockingkeys('Alice Jones'), [('jones', 'alice', None)])
+
+if __name__ == '__main__':
+    unittest.main()
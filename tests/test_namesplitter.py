@@ -0,0 +1,43 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_namesplitter - tests for loutilities.namesplitter
+'''
+# standard
+import unittest
+
+# homegrown
+from loutilities.namesplitter import split_full_name, split_full_names, is_salutation, is_suffix
+
+class NameSplitterTest(unittest.TestCase):
+
+    def test_parts(self):
+        self.assertEqual(split_full_name('dr. r. jason van der berg jr.'),
+                         {'salutation': 'Dr.', 'fname': 'R. Jason', 'initials': '', 'lname': 'Van Der Berg',
+                          'suffix': 'Jr'})
+        self.assertEqual(split_full_name('Mary J. kimura-fay (molly) PhD'),
+                         {'salutation': False, 'fname': 'Mary', 'initials': 'J.', 'lname': 'Kimura-Fay',
+                          'suffix': 'PhD'})
+        self.assertEqual(split_full_name('McDonald'),
+                         {'salutation': False, 'fname': 'McDonald', 'initials': '', 'lname': '', 'suffix': False})
+
+    def test_classify(self):
+        self.assertEqual([is_salutation(w) for w in ['Mister', 'MISS', 'fr.', 'john']], ['Mr.', 'Ms.', 'Fr.', False])
+        self.assertEqual([is_suffix(w) for w in ['iii', 'P.E.', 'jr', 'smith']], ['III', 'PE', 'Jr', False])
+
+    def test_memo_returns_copy(self):
+        name = split_full_name('John Smith')
+        name['lname'] = 'changed'
+        self.assertEqual(split_full_name('John Smith')['lname'], 'Smith')
+
+    def test_split_full_names(self):
+        names = ['John Smith', 'mrs jane doe', 'John Smith']
+        self.assertEqual(split_full_names(iter(names)), [split_full_name(n) for n in names])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_nicknames - tests for loutilities.nicknames
+'''
+# standard
+import os
+import shutil
+import tempfile
+import unittest
+
+# homegrown
+from loutilities.nicknames import NameDenormalizer
+
+class NameDenormalizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.csvfile = os.path.join(self.tmpdir, 'names.csv')
+        self.cachefile = os.path.join(self.tmpdir, 'names.pickle')
+        with open(self.csvfile, 'w') as f:
+            f.write('jeff,jeffrey,geoff\njeffrey,jefferson\nbob,robert\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookup(self):
+        nn = NameDenormalizer(self.csvfile)
+        self.assertEqual(nn['Jeffrey'], {'jeff', 'geoff', 'jefferson'})
+        self.assertEqual(nn.get('jeff'), {'jeffrey', 'geoff'})
+        self.assertIs(nn.get('jeff'), nn.get('JEFF'))
+        self.assertIsNone(nn.get('alice'))
+        self.assertRaises(KeyError, nn.__getitem__, 'alice')
+
+    def test_classids(self):
+        nn = NameDenormalizer(self.csvfile)
+        self.assertEqual(nn.classids('Jeffrey'), (0, 1))
+        self.assertEqual(nn.classids('jefferson'), (1,))
+        self.assertEqual(nn.classids('alice'), ())
+
+    def test_packaged(self):
+        nn = NameDenormalizer()
+        self.assertIn('jeffrey', nn['jeff'])
+
+    def test_cache(self):
+        nn = NameDenormalizer(self.csvfile, cachefile=self.cachefile)
+        self.assertTrue(os.path.exists(self.cachefile))
+        cached = NameDenormalizer(self.csvfile, cachefile=self.cachefile)
+        self.assertEqual(cached.lookup, nn.lookup)
+
+        # stale cache is rebuilt from csv
+        with open(self.csvfile, 'a') as f:
+            f.write('bob,bobby\n')
+        rebuilt = NameDenormalizer(self.csvfile, cachefile=self.cachefile)
+        self.assertEqual(rebuilt['bobby'], {'bob'})
+
+    def test_badcache(self):
+        with open(self.cachefile, 'wb') as f:
+            f.write(b'not a pickle')
+        nn = NameDenormalizer(self.csvfile, cachefile=self.cachefile)
+        self.assertEqual(nn['bob'], {'robert'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,346 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_textreader  -- test textreader
+=====================================================
+
+'''
+# standard
+import os
+import gzip
+import bz2
+import lzma
+import re
+import shutil
+import zipfile
+import tempfile
+import unittest
+
+# pypi
+from openpyxl import Workbook
+
+# home grown
+from loutilities.textreader import TextReader, TextDictReader, detectencoding, headerError, parameterError, PrefetchReader
+
+ROWS = [
+    ['Name', 'Age', 'Gender'],
+    ['Alice Smith', 34, 'F'],
+    ['Bob Jones', 51, 'M'],
+    ['Carol White', 27, 'F'],
+]
+
+FIELDXFORM = {
+    'name': ['name'],
+    'age': ['age'],
+    'gender': ['gender', 'sex'],
+}
+
+def readall(reader):
+    '''return all remaining rows from reader'''
+    rows = []
+    while True:
+        try:
+            rows.append(next(reader))
+        except StopIteration:
+            return rows
+
+def staledimension(filename):
+    '''rewrite xlsx file so its sheet claims a dimension of A1, as some third-party writers do'''
+    tmpname = filename + '.tmp'
+    with zipfile.ZipFile(filename) as inzip, zipfile.ZipFile(tmpname, 'w') as outzip:
+        for item in inzip.infolist():
+            data = inzip.read(item.filename)
+            if item.filename.startswith('xl/worksheets/'):
+                data = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', data)
+            outzip.writestr(item, data)
+    shutil.move(tmpname, filename)
+
+class TextReaderXlsxTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        wb = Workbook()
+        ws = wb.active
+        for row in ROWS:
+            ws.append(row)
+        wb.save(self.filename)
+
+    # executed after each test
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def test_readonly_rows(self):
+        tr = TextReader(self.filename)
+        rows = readall(tr)
+        tr.close()
+        self.assertEqual(rows, ROWS)
+
+    def test_fullload_matches_readonly(self):
+        tr = TextReader(self.filename, readonly=False)
+        rows = readall(tr)
+        tr.close()
+        self.assertEqual(rows, ROWS)
+
+    def test_dictreader(self):
+        dr = TextDictReader(self.filename, FIELDXFORM, ['name', 'age'])
+        self.assertEqual(next(dr), {'name': 'Alice Smith', 'age': 34, 'gender': 'F'})
+        self.assertEqual(next(dr), {'name': 'Bob Jones', 'age': 51, 'gender': 'M'})
+        dr.file.close()
+
+    def test_stale_dimension(self):
+        staledimension(self.filename)
+        tr = TextReader(self.filename)
+        rows = readall(tr)
+        tr.close()
+        self.assertEqual(rows, ROWS)
+
+    def test_ragged_rows(self):
+        # trailing empty cells and blank rows read as None, as in full mode
+        wb = Workbook()
+        ws = wb.active
+        for row in [['name', 'age', 'city'], ['al', 4], [], ['bo', 5, 'x']]:
+            ws.append(row)
+        wb.save(self.filename)
+        for readonly in [True, False]:
+            tr = TextReader(self.filename, readonly=readonly)
+            rows = readall(tr)
+            tr.close()
+            self.assertEqual(rows, [['name', 'age', 'city'], ['al', 4, None], [None, None, None], ['bo', 5, 'x']])
+        staledimension(self.filename)
+        dr = TextDictReader(self.filename, {'name': ['name'], 'age': ['age'], 'city': ['city']}, ['name'])
+        self.assertEqual(next(dr), {'name': 'al', 'age': 4, 'city': None})
+        dr.close()
+
+    def test_closed(self):
+        tr = TextReader(self.filename)
+        tr.close()
+        with self.assertRaises(ValueError):
+            next(tr)
+
+class TextReaderCsvTest(unittest.TestCase):
+
+    # executed prior to each test
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+
+    # executed after each test
+    def tearDown(self):
+        os.unlink(self.filename)
+
+    def write(self, text, encoding):
+        with open(self.filename, 'w', encoding=encoding, newline='') as out:
+            out.write(text)
+
+    def test_ascii_prefix_utf8_tail(self):
+        # non-ascii characters beyond the detection sample must still decode correctly
+        text = 'name,city\n' + 'Alice Smith,Frederick\n' * 5000 + 'Zoë Müller,Besançon\n'
+        self.write(text, 'utf-8')
+        tr = TextReader(self.filename)
+        rows = readall(tr)
+        tr.close()
+        self.assertEqual(rows[-1], ['Zoë Müller', 'Besançon'])
+        self.assertEqual(len(rows), 5002)
+
+    def test_sample_grows(self):
+        text = 'name,city\n' + 'Alice Smith,Frederick\n' * 5000
+        self.write(text, 'utf-8')
+        self.assertEqual(detectencoding(self.filename, samplesize=16, maxsamplesize=1024), 'utf-8')
+
+    def test_encoding_hint(self):
+        self.write('name,city\nZoë Müller,Besançon\n', 'latin-1')
+        tr = TextReader(self.filename, encoding='latin-1')
+        rows = readall(tr)
+        tr.close()
+        self.assertEqual(rows, [['name', 'city'], ['Zoë Müller', 'Besançon']])
+
+class TextDictReaderHeaderTest(unittest.TestCase):
+
+    def test_multiword_header_txt(self):
+        lines = [
+            'Race Results\n',
+            'Place  First Name  Last Name   Age Sex\n',
+            '1      Alice       Smith       34  F\n',
+            '2      Bob         Jones       51  M\n',
+        ]
+        fieldxform = {
+            'place': ['place', 'pl'],
+            'first': [['first', 'name'], 'first'],
+            'last': [['last', 'name'], 'last'],
+            'age': ['age'],
+            'gender': ['gender', 'sex'],
+        }
+        dr = TextDictReader(lines, fieldxform, ['first', 'last'], filetype='txt')
+        self.assertEqual(dr.fieldhdrs, ['place', 'first', 'last', 'age', 'gender'])
+        self.assertEqual(next(dr), {'place': '1', 'first': 'Alice', 'last': 'Smith', 'age': '34', 'gender': 'F'})
+
+    def test_match_precedence_csv(self):
+        # earlier match possibility wins even if a later one appears earlier in the line
+        lines = ['sex,gender,name\n', 'F,female,Alice\n']
+        fieldxform = {'gender': ['gender', 'sex'], 'name': ['name']}
+        dr = TextDictReader(lines, fieldxform, ['name'], filetype='csv')
+        self.assertEqual(next(dr), {'gender': 'female', 'name': 'Alice'})
+
+    def test_short_row_csv(self):
+        lines = ['name,age,gender\n', 'Alice,34\n']
+        dr = TextDictReader(lines, FIELDXFORM, ['name'], filetype='csv')
+        self.assertEqual(next(dr), {'name': 'Alice', 'age': '34'})
+
+    def test_header_not_found(self):
+        with self.assertRaises(headerError):
+            TextDictReader(['a,b\n', '1,2\n'], FIELDXFORM, ['name'], filetype='csv')
+
+class TextDictReaderChunksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = ['name,age,gender\n'] + ['runner{},{},{}\n'.format(i, 20+i, 'FM'[i%2]) for i in range(7)] + ['last\n']
+
+    def test_chunks(self):
+        dr = TextDictReader(self.lines, FIELDXFORM, ['name'], filetype='csv')
+        blocks = list(dr.read_chunks(3))
+        self.assertEqual([len(b['name']) for b in blocks], [3, 3, 2])
+        self.assertEqual(blocks[0], {'name': ['runner0', 'runner1', 'runner2'], 'age': ['20', '21', '22'], 'gender': ['F', 'M', 'F']})
+        self.assertEqual(blocks[-1], {'name': ['runner6', 'last'], 'age': ['26', None], 'gender': ['F', None]})
+
+    def test_chunks_xlsx(self):
+        fd, filename = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            wb = Workbook()
+            ws = wb.active
+            for row in ROWS:
+                ws.append(row)
+            wb.save(filename)
+            dr = TextDictReader(filename, FIELDXFORM, ['name'])
+            blocks = list(dr.read_chunks(10))
+            dr.file.close()
+        finally:
+            os.unlink(filename)
+        self.assertEqual(blocks, [{'name': ['Alice Smith', 'Bob Jones', 'Carol White'], 'age': [34, 51, 27], 'gender': ['F', 'M', 'F']}])
+
+    def test_chunks_asarray(self):
+        dr = TextDictReader(self.lines[:-1], FIELDXFORM, ['name'], filetype='csv')
+        block = next(dr.read_chunks(100, asarray=True, dtypes={'age': int}))
+        self.assertEqual(block['age'].sum(), sum(range(20, 27)))
+        self.assertEqual(len(block['name']), 7)
+
+class TextReaderCompressedTest(unittest.TestCase):
+
+    CSVTEXT = 'name,age,gender\nZoë Müller,34,F\nBob Jones,51,M\n'
+    CSVROWS = [['name', 'age', 'gender'], ['Zoë Müller', '34', 'F'], ['Bob Jones', '51', 'M']]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_csv_gz(self):
+        filename = self.path('results.csv.gz')
+        with gzip.open(filename, 'wt', encoding='utf-8', newline='') as out:
+            out.write(self.CSVTEXT)
+        tr = TextReader(filename)
+        self.assertEqual(readall(tr), self.CSVROWS)
+        tr.close()
+
+    def test_txt_bz2(self):
+        filename = self.path('results.txt.bz2')
+        with bz2.open(filename, 'wt') as out:
+            out.write('Name      Age\nAlice     34\n')
+        dr = TextDictReader(filename, {'name': ['name'], 'age': ['age']}, ['name', 'age'])
+        self.assertEqual(next(dr), {'name': 'Alice', 'age': '34'})
+        dr.file.close()
+
+    def test_zip_member(self):
+        filename = self.path('results.zip')
+        xlsxname = self.path('inner.xlsx')
+        wb = Workbook()
+        for row in ROWS:
+            wb.active.append(row)
+        wb.save(xlsxname)
+        with zipfile.ZipFile(filename, 'w') as archive:
+            archive.writestr('readme.md', 'not data')
+            archive.write(xlsxname, 'results.xlsx')
+            archive.writestr('other.csv', self.CSVTEXT.encode('utf-8'))
+
+        tr = TextReader(filename)
+        self.assertEqual(readall(tr), ROWS)
+        tr.close()
+
+        tr = TextReader(filename, member='other.csv')
+        self.assertEqual(readall(tr), self.CSVROWS)
+        tr.close()
+
+    def test_unknown_inner_extension(self):
+        filename = self.path('results.json.xz')
+        with lzma.open(filename, 'wb') as out:
+            out.write(b'{}')
+        with self.assertRaises(parameterError):
+            TextReader(filename)
+
+class TextReaderDelimitTest(unittest.TestCase):
+
+    def test_delimit(self):
+        tr = TextReader(['Name  Age\n'], filetype='txt')
+        tr.setdelimiter([0, 6, 10])
+        self.assertEqual(tr.delimit('Alice 34  F\n'), ['Alice', '34', 'F'])
+        self.assertEqual(tr.delimit('Bo\n'), ['Bo', '', ''])
+
+    def test_delimit_single(self):
+        tr = TextReader(['Name\n'], filetype='txt')
+        tr.setdelimiter([2])
+        self.assertEqual(tr.delimit('  Alice  \n'), ['Alice'])
+
+    def test_delimit_not_set(self):
+        tr = TextReader(['Name\n'], filetype='txt')
+        with self.assertRaises(parameterError):
+            tr.delimit('Alice')
+
+class PrefetchReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lines = ['name,age\n'] + ['runner{},{}\n'.format(i, i) for i in range(1000)]
+
+    def test_order(self):
+        pr = PrefetchReader(TextReader(self.lines, filetype='csv'), batchsize=7, queuesize=2)
+        rows = list(pr)
+        pr.close()
+        self.assertEqual(rows, [line.strip().split(',') for line in self.lines])
+
+    def test_dictreader(self):
+        pr = PrefetchReader(TextDictReader(self.lines, {'name': ['name'], 'age': ['age']}, ['name'], filetype='csv'))
+        self.assertEqual(next(pr), {'name': 'runner0', 'age': '0'})
+        self.assertEqual(len(list(pr)), 999)
+        pr.close()
+
+    def test_exception(self):
+        def lines():
+            yield 'a,b\n'
+            yield 'c,d\n'
+            raise RuntimeError('bad input')
+        pr = PrefetchReader(TextReader(lines(), filetype='csv'))
+        self.assertEqual(next(pr), ['a', 'b'])
+        self.assertEqual(next(pr), ['c', 'd'])
+        with self.assertRaises(RuntimeError):
+            next(pr)
+        pr.close()
+
+    def test_close_early(self):
+        pr = PrefetchReader(TextReader(self.lines, filetype='csv'), batchsize=1, queuesize=1)
+        next(pr)
+        pr.close()
+        self.assertFalse(pr.thread.is_alive())
+        with self.assertRaises(ValueError):
+            next(pr)
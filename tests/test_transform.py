@@ -0,0 +1,68 @@
+###########################################################################################
+#       Date            Author          Reason
+#       ----            ------          ------
+#       10/18/26        Lou King        Create
+#
+#   Copyright 2026 Lou King.  All rights reserved
+###########################################################################################
+'''
+test_transform  -- test transform
+=====================================================
+
+'''
+# standard
+import unittest
+from collections import OrderedDict
+
+# home grown
+from loutilities.transform import Transform
+
+class Target():
+    pass
+
+class Source():
+    def __init__(self, **kwargs):
+        for key in kwargs:
+            setattr(self, key, kwargs[key])
+
+class TransformTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mapping = OrderedDict([
+            ('age', 'age'),
+            ('active', 'active'),
+            ('name', 'name'),
+            ('initial', lambda s: s['name'][0] if isinstance(s, dict) else s.name[0]),
+        ])
+
+    def test_dict(self):
+        xform = Transform(self.mapping, sourceattr=False, targetattr=False)
+        target = {}
+        xform.transform({'age': ' 34 ', 'active': 'true', 'name': 'Alice '}, target)
+        self.assertEqual(target, {'age': 34, 'active': True, 'name': 'Alice', 'initial': 'A'})
+
+    def test_knownstrings(self):
+        xform = Transform(self.mapping, sourceattr=False, targetattr=False, knownstrings=['age', 'active'])
+        target = {}
+        xform.transform({'age': '034', 'active': 'False', 'name': '5.5'}, target)
+        self.assertEqual(target, {'age': '034', 'active': 'False', 'name': 5.5, 'initial': 5})
+
+    def test_attr(self):
+        xform = Transform(self.mapping)
+        target = Target()
+        xform.transform(Source(age=7, active='False', name='Bob'), target)
+        self.assertEqual((target.age, target.active, target.name, target.initial), (7, False, 'Bob', 'B'))
+
+    def test_transform_many(self):
+        xform = Transform(self.mapping, sourceattr=False, targetattr=False)
+        sources = ({'age': str(i), 'active': 'True', 'name': 'runner{}'.format(i)} for i in range(3))
+        targets = xform.transform_many(sources, dict)
+        self.assertEqual([t['age'] for t in targets], [0, 1, 2])
+        self.assertEqual(targets[2], {'age': 2, 'active': True, 'name': 'runner2', 'initial': 'r'})
+
+    def test_mixedtypes(self):
+        # converter adapts to previous value type, but result must match str2num for every value
+        xform = Transform({'v': 'v'}, sourceattr=False, targetattr=False)
+        values = ['12', '1.5', 'x', 'true', '7', 'False', '2.0', None, 3, '1e2']
+        targets = xform.transform_many(({'v': v} for v in values), dict)
+        self.assertEqual([t['v'] for t in targets], [12, 1.5, 'x', True, 7, False, 2.0, None, 3, 100.0])